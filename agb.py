@@ -8,12 +8,16 @@ from optparse import OptionParser, OptionGroup, Option
 from os.path import exists
 
 from agb_src.scripts.config import *
-from agb_src.scripts.graph_parser import parse_gfa, parse_abyss_dot, parse_flye_dot, fastg_to_gfa, get_edges_from_gfa, \
-    format_edges_file
+from agb_src.scripts.graph_cache import get_graph_cache_key, load_graph_cache, save_graph_cache
+from agb_src.scripts.graph_layout import LAYOUT_CACHE_DIRNAME
+from agb_src.scripts.graph_parser import parse_gfa, parse_fastg, parse_dot, format_edges_file
 from agb_src.scripts.info_parser import parse_canu_output, parse_flye_output, parse_spades_output
+from agb_src.scripts.input_detector import detect_input, detect_graph_format, GFA1_FORMAT, GFA2_FORMAT, \
+    FASTG_FORMAT, DOT_FORMAT
+from agb_src.scripts.partitioner import PARTITIONERS, AUTO_NAME, METIS_NAME, LABEL_PROPAGATION_NAME, check_partitioner
 from agb_src.scripts.quast_runner import run_quast_analysis
-from agb_src.scripts.utils import embed_css_and_scripts, get_scaffolds_fpath, is_empty_file, is_abyss, is_canu, is_flye, \
-    is_spades
+from agb_src.scripts.utils import embed_css_and_scripts, get_scaffolds_fpath, is_empty_file, is_canu, is_flye, \
+    is_spades, load_dir_manifest, get_path_to_program
 from agb_src.scripts.viewer_builder import build_jsons
 
 
@@ -37,38 +41,41 @@ class AGBOption(Option):
     TYPE_CHECKER['dir'] = check_dir
 
 
-def parse_assembler_output(assembler_name, input_dirpath, input_fpath, output_dirpath, input_fasta_fpath, min_edge_len):
+def parse_assembler_output(assembler_name, input_dirpath, input_fpath, output_dirpath, input_fasta_fpath, min_edge_len,
+                           workers=1, graph_format=None, extract_seqs=False):
+    # edge sequences are written to the output folder only if they are needed for the alignment to the reference
+    seqs_dirpath = output_dirpath if extract_seqs else None
     edges_fpath = None
     if not is_empty_file(input_fpath):
         contig_edges = []
-        if input_fpath.endswith("fastg"):
-            input_fpath = fastg_to_gfa(input_fpath, output_dirpath, assembler_name)
-        if not input_fpath:
-            sys.exit("ERROR! Failed parsing " + input_fpath + " file.")
-        if input_fpath.endswith("gfa") or input_fpath.endswith("gfa2"):
-            dict_edges = parse_gfa(input_fpath, min_edge_len)
-            edges_fpath = get_edges_from_gfa(input_fpath, output_dirpath, min_edge_len)
-        elif input_fpath.endswith("dot") or input_fpath.endswith("gv"):
-            edges_fpath = format_edges_file(input_fasta_fpath, output_dirpath)
-            dict_edges = dict()
-            if is_abyss(assembler_name):
-                dict_edges = parse_abyss_dot(input_fpath, min_edge_len)
-            if not dict_edges:
-                try:
-                    dict_edges = parse_flye_dot(input_fpath, min_edge_len)
-                except Exception as e:
-                    sys.exit("ERROR! Failed parsing " + input_fpath + " file.\n"
-                             "During parsing the following error has occured: " + str(e) +
-                             "\nPlease make sure that you correctly specified the assembler name using -a option. "
-                             "DOT files produced by different assemblers can have very different formats.\n"
-                             "Examples of input data can be found here https://github.com/almiheenko/AGB/tree/master/test_data")
+        graph_format = graph_format or detect_graph_format(input_fpath)
+        if graph_format == FASTG_FORMAT:
+            dict_edges, edges_fpath = parse_fastg(input_fpath, min_edge_len, output_dirpath=seqs_dirpath)
+        elif graph_format == GFA1_FORMAT or graph_format == GFA2_FORMAT:
+            dict_edges, edges_fpath = parse_gfa(input_fpath, min_edge_len, output_dirpath=seqs_dirpath,
+                                                workers=workers)
+        elif graph_format == DOT_FORMAT:
+            edges_fpath = format_edges_file(input_fasta_fpath, seqs_dirpath)
+            try:
+                dict_edges = parse_dot(input_fpath, min_edge_len, assembler_name)
+            except Exception as e:
+                sys.exit("ERROR! Failed parsing " + input_fpath + " file.\n"
+                         "During parsing the following error has occured: " + str(e) +
+                         "\nPlease make sure that you correctly specified the assembler name using -a option. "
+                         "DOT files produced by different assemblers can have very different formats.\n"
+                         "Examples of input data can be found here https://github.com/almiheenko/AGB/tree/master/test_data")
+        else:
+            sys.exit("ERROR! Format of " + input_fpath + " file is not recognized. "
+                     "Supported formats: GFA1/GFA2/FASTG/GraphViz.")
     else:
         if is_canu(assembler_name):
-            dict_edges, contig_edges, edges_fpath = parse_canu_output(input_dirpath, output_dirpath, min_edge_len)
+            dict_edges, contig_edges, edges_fpath = parse_canu_output(input_dirpath, seqs_dirpath, min_edge_len,
+                                                                      workers=workers)
         elif is_flye(assembler_name):
-            dict_edges, contig_edges, edges_fpath = parse_flye_output(input_dirpath, output_dirpath, min_edge_len)
+            dict_edges, contig_edges, edges_fpath = parse_flye_output(input_dirpath, seqs_dirpath, min_edge_len)
         elif is_spades(assembler_name):
-            dict_edges, contig_edges, edges_fpath = parse_spades_output(input_dirpath, output_dirpath, min_edge_len)
+            dict_edges, contig_edges, edges_fpath = parse_spades_output(input_dirpath, seqs_dirpath, min_edge_len,
+                                                                        workers=workers)
         else:
             sys.exit("Output folder of %s assembler can not be parsed! Supported assemblers: %s. "
                      "More assemblers will be added in the next release.\n"
@@ -77,7 +84,8 @@ def parse_assembler_output(assembler_name, input_dirpath, input_fpath, output_di
                      "and (optionally) file with edge sequences using --fasta option" %
                      (assembler_name, ', '.join(SUPPORTED_ASSEMBLERS)))
     for edge_id, edge in dict_edges.items():
-        dict_edges[edge_id].start, dict_edges[edge_id].end = str(edge.start), str(edge.end)
+        # node names are shared by all edges incident to the node
+        dict_edges[edge_id].start, dict_edges[edge_id].end = sys.intern(str(edge.start)), sys.intern(str(edge.end))
     return dict_edges, contig_edges, edges_fpath
 
 
@@ -88,12 +96,24 @@ def main():
 
     group = OptionGroup(parser, "Common Options",
                         "Options that can be used in any mode")
-    group.add_option('-a', '--assembler', dest='assembler', help='Required. Assembler name.') #, choices=[ABYSS_NAME, CANU_NAME, FLYE_NAME, SPADES_NAME])
+    group.add_option('-a', '--assembler', dest='assembler', help='Assembler name [default: detected from the input]') #, choices=[ABYSS_NAME, CANU_NAME, FLYE_NAME, SPADES_NAME])
     group.add_option('-o', dest='output_dir', help='Output directory [default: agb_output]', default='agb_output')
     group.add_option('-r', dest='reference', help='Path to the reference genome')
     group.add_option('-t', dest='threads', help='Maximum number of threads [default: %d]' % DEFAULT_THREADS, default=DEFAULT_THREADS)
     group.add_option('-m', type='int', dest='min_edge_len', help='Lower threshold for edge length [default: %d]' % MIN_EDGE_LEN, default=MIN_EDGE_LEN)
     group.add_option('--meta', dest='is_meta', action='store_true', help='Use QUAST options for metagenome', default=False)
+    group.add_option('--parse-workers', type='int', dest='parse_workers',
+                     help='Number of processes used for parsing large GFA files [default: the number of threads]')
+    group.add_option('--partitioner', dest='partitioner', default=AUTO_NAME,
+                     choices=[AUTO_NAME] + list(PARTITIONERS),
+                     help='Method used to split big graph components into smaller subgraphs: %s '
+                          '[default: %s, i.e. %s if networkx-metis is installed, otherwise %s]' %
+                          (', '.join(PARTITIONERS), AUTO_NAME, METIS_NAME, LABEL_PROPAGATION_NAME))
+    group.add_option('--layout', dest='layout', action='store_true', default=False,
+                     help='Compute layouts of graph components with Graphviz dot, so the viewer does not lay them out '
+                          'in the browser. Requires Graphviz. Layouts are cached in the output directory')
+    group.add_option('--no-cache', dest='no_cache', action='store_true', default=False,
+                     help='Do not reuse the parsed assembly graph and the listing of the input folder stored in the output directory by the previous run')
     parser.add_option_group(group)
 
     group = OptionGroup(parser, "Special Options")
@@ -104,8 +124,8 @@ def main():
     parser.add_option_group(group)
 
     parser.set_usage('Usage: \n' +
-                     '1) ' + __file__ + ' [options] --graph assembly_graph_file -a <assembler_name> [--fasta file_with_graph_edge_sequences]\n'
-                     '2) ' + __file__ + ' [options] -a <assembler_name> -i <assembler_output_dir>\tThis option is supported for %s assemblers only.' % ', '.join(SUPPORTED_ASSEMBLERS))
+                     '1) ' + __file__ + ' [options] --graph assembly_graph_file [-a <assembler_name>] [--fasta file_with_graph_edge_sequences]\n'
+                     '2) ' + __file__ + ' [options] [-a <assembler_name>] -i <assembler_output_dir>\tThis option is supported for %s assemblers only.' % ', '.join(SUPPORTED_ASSEMBLERS))
 
     opts, args = parser.parse_args()
 
@@ -114,9 +134,22 @@ def main():
               'an assembler output folder using the option -i.\nUse --help to see the full usage information')
         sys.exit(1)
 
-    if not opts.assembler:
-        print('ERROR! You should specify the name of the used assembler software using the option -a\n'
-              'Use --help to see the full usage information')
+    try:
+        graph_format, detected_assembler = detect_input(opts.input_dir, opts.input_file)
+    except IOError as e:
+        sys.exit("ERROR! " + str(e))
+    if not opts.assembler and detected_assembler:
+        print("Assembler detected from the input: " + detected_assembler)
+        opts.assembler = detected_assembler
+    if not opts.assembler and opts.input_dir:
+        print('ERROR! Failed to detect the assembler by the content of %s. You should specify the name of the used '
+              'assembler software using the option -a\n'
+              'Use --help to see the full usage information' % opts.input_dir)
+        sys.exit(1)
+
+    partitioner_error = check_partitioner(opts.partitioner)
+    if partitioner_error:
+        print("ERROR! " + partitioner_error)
         sys.exit(1)
 
     if opts.input_fasta and not opts.input_file:
@@ -126,8 +159,26 @@ def main():
 
     if not exists(opts.output_dir):
         os.makedirs(opts.output_dir)
-    dict_edges, contig_edges, edges_fpath = parse_assembler_output(opts.assembler, opts.input_dir, opts.input_file,
-                                                                   opts.output_dir, opts.input_fasta, opts.min_edge_len)
+    if opts.input_dir:
+        load_dir_manifest(opts.input_dir, opts.output_dir, reuse=not opts.no_cache)
+    parse_workers = opts.parse_workers or int(opts.threads)
+    extract_seqs = bool(opts.reference)
+    cache_key = get_graph_cache_key(opts.assembler, opts.input_dir, opts.input_file, opts.input_fasta, opts.min_edge_len,
+                                    extract_seqs)
+    cached_graph = None if opts.no_cache else load_graph_cache(opts.output_dir, cache_key, opts.input_dir)
+    if cached_graph:
+        print("Loading the assembly graph parsed by the previous run...")
+        dict_edges, contig_edges, edges_fpath = cached_graph
+    else:
+        try:
+            dict_edges, contig_edges, edges_fpath = parse_assembler_output(opts.assembler, opts.input_dir, opts.input_file,
+                                                                           opts.output_dir, opts.input_fasta,
+                                                                           opts.min_edge_len, workers=parse_workers,
+                                                                           graph_format=graph_format,
+                                                                           extract_seqs=extract_seqs)
+        except IOError as e:
+            sys.exit("ERROR! " + str(e))
+        save_graph_cache(opts.output_dir, cache_key, dict_edges, contig_edges, edges_fpath, opts.input_dir)
     scaffolds_fpath = get_scaffolds_fpath(opts.assembler, opts.input_dir)
     json_output_dirpath = join(opts.output_dir, "data")
     if not exists(json_output_dirpath):
@@ -141,7 +192,14 @@ def main():
         run_quast_analysis(edges_fpath, opts.reference, opts.output_dir, json_output_dirpath, opts.threads, contig_edges,
                            dict_edges, is_meta=opts.is_meta)
 
-    build_jsons(dict_edges, opts.input_dir, json_output_dirpath, mapping_info, chrom_names, edge_by_chrom, contig_edges, opts.assembler)
+    layout_cache_dirpath = None
+    if opts.layout:
+        if get_path_to_program("dot"):
+            layout_cache_dirpath = join(opts.output_dir, LAYOUT_CACHE_DIRNAME)
+        else:
+            print("Graphviz dot is not found! Graph components will be laid out in the browser")
+    build_jsons(dict_edges, opts.input_dir, json_output_dirpath, mapping_info, chrom_names, edge_by_chrom, contig_edges, opts.assembler,
+                threads=int(opts.threads), partitioner=opts.partitioner, layout_cache_dirpath=layout_cache_dirpath)
     output_fpath = join(opts.output_dir, HTML_NAME)
     with io.open(TEMPLATE_PATH, 'r', encoding="utf-8") as f: html = f.read()
     html = embed_css_and_scripts(html)
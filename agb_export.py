@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+import sys
+from optparse import OptionParser
+
+from agb_src.scripts.seq_store import load_seq_store, parse_edge_region
+from agb_src.scripts.utils import format_edge_id
+
+
+def main():
+    description = (
+        'The program will export sequences of the selected assembly graph edges in FASTA format')
+    parser = OptionParser(description=description)
+    parser.add_option('-e', dest='edges', help='Comma-separated list of edges (e1, rc1, 1 or -1), '
+                                               'a part of the edge can be specified as e1:101-200')
+    parser.add_option('-o', dest='output_file', help='Output FASTA file [default: stdout]')
+    parser.add_option('--index', dest='index_file',
+                      help='Path to the sequence index [default: <input_file>.fai, built on the first run]')
+    parser.set_usage('Usage: \n' + __file__ + ' [options] -e <edges> <GFA/FASTG file or FASTA file with edge sequences>')
+
+    opts, args = parser.parse_args()
+    if len(args) != 1 or not opts.edges:
+        print('ERROR! You should specify a file with edge sequences and a list of edges using the option -e.\n'
+              'Use --help to see the full usage information')
+        sys.exit(1)
+
+    regions = []
+    for region in opts.edges.split(','):
+        region = region.strip()
+        try:
+            regions.append((region, parse_edge_region(region)))
+        except ValueError:
+            sys.exit("ERROR! Invalid edge region: " + region)
+    try:
+        seq_store = load_seq_store(args[0], opts.index_file)
+    except (ValueError, OSError) as e:
+        sys.exit("ERROR! " + str(e))
+    for region, (edge_id, start, end) in regions:
+        if edge_id in seq_store and (end or start + 1) > seq_store.get_length(edge_id):
+            seq_store.close()
+            sys.exit("ERROR! Invalid edge region: %s (the edge length is %d)" % (region, seq_store.get_length(edge_id)))
+    out_f = open(opts.output_file, 'wb') if opts.output_file else sys.stdout.buffer
+    for region, (edge_id, start, end) in regions:
+        if edge_id not in seq_store:
+            print("Warning! Sequence of %s is not found in %s" % (region, args[0]), file=sys.stderr)
+            continue
+        seq_name = format_edge_id(edge_id) + (region[region.find(':'):] if ':' in region else '')
+        out_f.write(b">" + seq_name.encode() + b"\n")
+        out_f.write(seq_store.get_seq(edge_id, start, end))
+        out_f.write(b"\n")
+    if opts.output_file:
+        out_f.close()
+    seq_store.close()
+
+
+if __name__ == '__main__':
+    main()
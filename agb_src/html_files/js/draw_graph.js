@@ -95,7 +95,7 @@ function render(doRefresh, doAnimate, doRefreshTables) {
                 var edgeWidth = d3.select(this).select('path').attr('stroke-width');
                 d3.select(this).select('path').attr("stroke-width", parseInt(edgeWidth) + 4);
                 var edgeId = d3.select(this).attr('id');
-                var curEdge = defEdgeData[edgeId] || defEdgeData[edgeId];
+                var curEdge = edgeData[edgeId];
                 if (curEdge) { // add edge tooltip
                     tooltipDiv.transition()
                         .delay(500)
@@ -128,7 +128,7 @@ function render(doRefresh, doAnimate, doRefreshTables) {
             if (!d3.select(this).select('text').empty()) {
                 var edgeId = d3.select(this).attr('id');
                 if (edgeData[edgeId]) {
-                    curEdge = defEdgeData[d3.select(this).attr('id')];
+                    curEdge = edgeData[edgeId];
                     selectEdge(d3.select(this).attr('id'), curEdge.id, curEdge.len, curEdge.cov, curEdge.mult);
                 }
                 else selectEdge(d3.select(this).attr('id'));
@@ -144,15 +144,47 @@ function render(doRefresh, doAnimate, doRefreshTables) {
                                         .delay(0)
                                         .duration(timeTransition)
                                 : d3.transition().duration(0);
+    // use positions precomputed by Graphviz if all nodes of the component are laid out
+    var layout = srcGraphs[componentN].layout;
+    var layoutDot = layout ? addLayout(dot, layout) : null;
     graphviz
         .tweenShapes(true)
         .transition(graphTransition)
         .totalMemory(104857600)  // set memory limit to 100Mb instead of 16Mb by default
-        .dot(dot)
+        .engine(layoutDot ? 'nop2' : 'dot')
+        .dot(layoutDot || dot)
         .render();
 
 }
 
+function addLayout(dot, layout) {
+    // edges without the precomputed spline (e.g. collapsed ones) are routed by the nop2 engine
+    var dotLines = dot.split('\n');
+    var nodes = new Set();
+    for (var i = 0; i < dotLines.length; i++) {
+        var edgeMatches = dotLines[i].match(edgePattern);
+        if (!edgeMatches) continue;
+        var start = edgeMatches[1], end = edgeMatches[2];
+        if (!layout.nodes[start] || !layout.nodes[end]) return null;
+        nodes.add(start);
+        nodes.add(end);
+        var idMatches = dotLines[i].match(idPattern);
+        var edgeLayout = idMatches ? layout.edges[idMatches[1]] : null;
+        if (edgeLayout && edgeLayout[0] == start && edgeLayout[1] == end) {
+            var attrs = 'pos="' + edgeLayout[2] + '",' + (edgeLayout[3] ? 'lp="' + edgeLayout[3] + '",' : '');
+            dotLines[i] = dotLines[i].replace(' [', ' [' + attrs);
+        }
+    }
+    if (!nodes.size) return null;
+    var closingIdx = dotLines.lastIndexOf('}');
+    if (closingIdx == -1) return null;
+    var nodeLines = Array.from(nodes).map(function(node) {
+        return '"' + node + '" [pos="' + layout.nodes[node] + '"];';
+    });
+    dotLines.splice.apply(dotLines, [closingIdx, 0].concat(nodeLines));
+    return dotLines.join('\n');
+}
+
 function highlightNodes() {
     d3.selectAll('.node').classed('unbalanced_node', false);
     d3.selectAll('.node').classed('hanging_node', false);
@@ -221,24 +253,27 @@ function highlightContigEdges() {
             edge = contigInfo[selectedContig].edges[i];
             if (edge != "*" && edge != "??") {
                 var edgeElId = edge[0] == '-' ? 'rc' + edge.substr(1) : 'e' + edge;
-                var edgeId = getEdgeElement(edgeData[edgeElId]);
+                // edges of the contig outside of the loaded graph components are not shown
+                var edgeId = edgeData[edgeElId] ? getEdgeElement(edgeData[edgeElId]) : edgeElId;
+                var contigEdge = getEdgeSummary(edgeElId);
+                var isUniqueEdge = !contigEdge || contigEdge.unique;
                 //console.log(edgeId, edgeElId)
                 visEdgeId = d3.select('#' + edgeId).empty() ? edgeElId : edgeId;
                 if (!d3.select('#' + visEdgeId).empty()) {
                      realEdges.push(edgeId);
-                     if (defEdgeData[edgeElId].unique)
+                     if (isUniqueEdge)
                         graphEdges.push('<b>' + edge + '</b>');
                      else
-                        graphEdges.push(edge + ' (' + defEdgeData[edgeElId].mult + ')');
+                        graphEdges.push(edge + ' (' + contigEdge.mult + ')');
                      d3.select('#' + visEdgeId).selectAll('path')
                        .filter(function(d) {return d3.select(this).attr('stroke') !== '#ffffff'; }).classed('contig_selected',true);
                      d3.select('#' + visEdgeId).selectAll('polygon').classed('contig_selected',true);
                 }
                 else {
-                     if (defEdgeData[edgeElId].unique)
+                     if (isUniqueEdge)
                         graphEdges.push('<span class="hidden_edge_text"><b>' + edge + '</b></span>');
                      else
-                        graphEdges.push('<span class="hidden_edge_text">' + edge + '</span> (' + defEdgeData[edgeElId].mult + ')');
+                        graphEdges.push('<span class="hidden_edge_text">' + edge + '</span> (' + contigEdge.mult + ')');
                     isHiddenEdges = true;
                 }
                 selectedEdges.add(edge);
@@ -298,7 +333,42 @@ function highlightChromEdges() {
     return firstEdge;
 }
 
+function loadComponent(suffix, component, callback) {
+    // DOT of each graph component is stored in a separate file which is loaded when the component is shown
+    var script = document.createElement('script');
+    script.src = 'data/' + suffix + '_components/' + component + '.json';
+    script.onload = function() {
+        document.head.removeChild(script);
+        callback();
+    };
+    script.onerror = function() {
+        document.head.removeChild(script);
+        console.log('Failed to load ' + script.src);
+    };
+    document.head.appendChild(script);
+}
+
+function componentLoaded(suffix, component, componentDot, componentData) {
+    // called by the loaded file of the graph component
+    var graphs = window[suffix + '_graphs'];
+    var modeEdgeData = window[suffix + 'EdgeData'];
+    for (var edgeId in componentData.edges) {
+        modeEdgeData[edgeId] = componentData.edges[edgeId];
+    }
+    graphs[component].dot = componentDot;
+    graphs[component].layout = componentData.layout;
+}
+
 function updateDot(doRefresh, doAnimate, doRefreshTables) {
+    if (srcGraphs[componentN].dot === undefined) {
+        var graphs = srcGraphs, component = componentN;
+        loadComponent(modeSuffixes[selectedMethod], component, function() {
+            // the user can switch to another component while the file is loading
+            if (graphs === srcGraphs && component === componentN)
+                updateDot(doRefresh, doAnimate, doRefreshTables);
+        });
+        return;
+    }
     $(".tooltip").tooltip("hide");
     deselectAll();
     dotSrc = srcGraphs[componentN].dot;
@@ -745,8 +815,10 @@ function updateDot(doRefresh, doAnimate, doRefreshTables) {
                 edgeId = matches[1];
                 edgeRealId = (edgeInfo[edgeId] || !edgeData[edgeId]) ? edgeId : edgeData[edgeId].el_id;
                 var color = 'black';
-                if (refEdgeData[edgeRealId] && refEdgeData[edgeRealId].chrom) {
-                    color = refEdgeData[edgeRealId].chrom;
+                // a copy of the edge has the same chromosome as the edge loaded with another graph component
+                var chromEdge = edgeData[edgeRealId] || edgeData[edgeId];
+                if (chromEdge && chromEdge.chrom) {
+                    color = chromEdge.chrom;
                 }
                 var oldColor = dotSrcLines[i].match(colorPattern);
 
@@ -773,7 +845,7 @@ function updateDot(doRefresh, doAnimate, doRefreshTables) {
                 edgeId = matches[1];
                 edgeRealId = (edgeInfo[edgeId] || !edgeData[edgeId]) ? edgeId : edgeData[edgeId].el_id;
                 // highlight an edge with red color if it is in a misassembled contig and with dark red color if it contains a misassembly itself
-                if (edgeData[edgeRealId] && edgeData[edgeRealId].errors.length > 0)
+                if (edgeSummary[edgeRealId] && getEdgeSummary(edgeRealId).errorsN > 0)
                     color = "#b90000:white:#b90000";
                 else if (edgeInfo[edgeRealId]) {
                     for (var j=0;j<edgeInfo[edgeRealId].length;j++)
@@ -785,7 +857,7 @@ function updateDot(doRefresh, doAnimate, doRefreshTables) {
                 // if errors are not found, repeat the check for reverse complement edge
                 if (color === "green") {
                     edgeRealId = edgeRealId[0] == "e" ? edgeRealId.replace("e", "rc") : edgeRealId.replace("rc", "e");
-                    if (edgeData[edgeRealId] && edgeData[edgeRealId].errors.length > 0)
+                    if (edgeSummary[edgeRealId] && getEdgeSummary(edgeRealId).errorsN > 0)
                         color = "#b90000:white:#b90000";
                     else if (edgeInfo[edgeRealId]) {
                         for (var j=0;j<edgeInfo[edgeRealId].length;j++)
@@ -833,21 +905,21 @@ function searchEdge(event) {
   }
 }
 
+function getEdgeSummary(edgeId) {
+    // fields of the edge available before its graph component is loaded,
+    // the summary is stored as [len, cov, component, mult, unique, start, end, number of errors]
+    var summary = edgeSummary[edgeId];
+    if (!summary) return undefined;
+    var realId = edgeId.split('_')[0];
+    return {id: realId, el_id: realId, name: getEdgeName(realId), len: summary[0], cov: summary[1], comp: summary[2],
+            mult: summary[3], unique: summary[4], s: summary[5], e: summary[6], errorsN: summary[7]};
+}
+
 function getEdgeComponent(edgeId) {
     // get the number of component containing the edge
-    if (edgeData[edgeId])
-        edge = edgeData[edgeId];
-    else if (loopEdgeDict[edgeId])
-        edge = edgeData[loopEdgeDict[edgeId][0]];
-    if (selectedMethod == "repeat")
-        edgeComponent = edge.rep_comp;
-    else if (selectedMethod == "ref") {
-        edgeComponent = refEdgeData[edgeId].ref_comp;
-    }
-    else if (selectedMethod == "contig")
-        edgeComponent = refEdgeData[edgeId].contig_comp;
-    else edgeComponent = edge.comp;
-    return edgeComponent;
+    if (!edgeSummary[edgeId] && loopEdgeDict[edgeId])
+        edgeId = loopEdgeDict[edgeId][0];
+    return edgeSummary[edgeId] ? edgeSummary[edgeId][2] : undefined;
 }
 
 function getEdgeElement(edge) {
@@ -858,9 +930,14 @@ function getEdgeElement(edge) {
 
 function selectEdgeByLabel(edgeLabel) {
     var edgeId = edgeLabel[0] == '-' ? 'rc' + edgeLabel.substr(1) : 'e' + edgeLabel;
-    if (edgeData[edgeId]) {
+    edgeComponent = getEdgeComponent(edgeId);
+    if (srcGraphs[edgeComponent]) {
+        if (srcGraphs[edgeComponent].dot === undefined) {
+            // details of the edge are loaded with its graph component
+            loadComponent(modeSuffixes[selectedMethod], edgeComponent, function() { selectEdgeByLabel(edgeLabel); });
+            return;
+        }
         curEdge = edgeData[edgeId];
-        edgeComponent = getEdgeComponent(edgeId);
         selectedEdge = getEdgeElement(curEdge);
         console.log(edgeComponent, edgeId)
         if (edgeComponent != componentN) changeComponent(edgeComponent);
@@ -900,26 +977,27 @@ function checkEdgeCoverage(edgeId) {
 }
 
 function checkEdgeWithThresholds(edgeId) {
-    edge = edgeData[edgeId];
+    edge = getEdgeSummary(edgeId);
     if ((minCoverage && edge.cov < minCoverage) || (maxCoverage && edge.cov > maxCoverage) || edge.len < minLen || (maxLen && edge.len > maxLen))
         return false;
     return true;
 }
 
 function checkRepeatEdgeId(edgeId) {
-    edge = edgeData[edgeId];
+    edge = getEdgeSummary(edgeId);
     if (edge) {
         source = newData[edgeId] ? newData[edgeId][0] : edge.s;
         end = newData[edgeId] ? newData[edgeId][1] : edge.e;
     }
     // check whether the edge is repetitive and should be shown
-    if ($('#collapse_repeats_checkbox')[0].checked && !edgeData[edgeId].unique && !expandedNodes.has(source) && !expandedNodes.has(end))
+    if ($('#collapse_repeats_checkbox')[0].checked && !edge.unique && !expandedNodes.has(source) && !expandedNodes.has(end))
         return false;
     return true;
 }
 
 function checkEdge(edgeId, targetN) {
-    var edge = edgeData[edgeId];
+    // edges of all graph components are checked by their summaries
+    var edge = getEdgeSummary(edgeId);
     var targetComponent = NaN;
     if (selectedMethod == "default") targetComponent = !isNaN(parseInt(targetN)) ? targetN : componentN;
     else if (selectedMethod == "ref" && !isNaN(parseInt(targetN))) targetComponent = chromosomes[targetN];
@@ -935,7 +1013,7 @@ function checkEdge(edgeId, targetN) {
         return false;
     // if($('#break_checkbox')[0].checked && edgeData[edgeId].unique)
     //    return false;
-    if (selectedMethod == "ref" && (!defEdgeData[edgeId] || !edgeMappingInfo[edge.id] || (targetComponent && edgeMappingInfo[edge.id].indexOf(targetComponent) === -1)))
+    if (selectedMethod == "ref" && (!defEdgeSummary[edgeId] || !edgeMappingInfo[edge.id] || (targetComponent && edgeMappingInfo[edge.id].indexOf(targetComponent) === -1)))
     {
        if (!$('#adj_edges_checkbox')[0].checked || !checkEdgeWithThresholds(edgeId))
            return false;
@@ -943,7 +1021,7 @@ function checkEdge(edgeId, targetN) {
     if (selectedMethod == "contig") {
         // check whether the contig contains the edge or the edge is adjacent to contig edges
         var contigEdges = targetComponent ? contigInfo[targetComponent].edges : contigInfo[contigs[componentN]].edges;
-        var edgeName = edgeData[edgeId].name;
+        var edgeName = edge.name;
         var edgeMatchName = edgeName[0] == '-' ? edgeName.replace('-', '') : '-' + edgeName;
         if (contigEdges.indexOf(edgeName) == -1 && contigEdges.indexOf(edgeMatchName) == -1)
         {
@@ -971,7 +1049,7 @@ function selectEdge(edge, edgeId, edgeLen, edgeCov, edgeMulti) {
         for (var k = 0; k < loopEdgeDict[selectedEdge].length; k++) {
             var curLoopEdge = loopEdgeDict[selectedEdge][k];
             if (checkEdge(curLoopEdge)) {
-                edge = defEdgeData[curLoopEdge];
+                edge = edgeData[curLoopEdge];
 
                 edgeDescription = edgeDescription +
                         '<li>Edge ID: ' + edge.name +
@@ -1002,8 +1080,8 @@ function selectEdge(edge, edgeId, edgeLen, edgeCov, edgeMulti) {
     else if (parallelEdgeDict[selectedEdge]) {
         edgeDescription = '<ul><b>Edges:</b>';
         for (var k = 0; k < parallelEdgeDict[selectedEdge].length; k++) {
-            if (defEdgeData[parallelEdgeDict[selectedEdge][k]]) {
-                edge = defEdgeData[parallelEdgeDict[selectedEdge][k]];
+            if (edgeData[parallelEdgeDict[selectedEdge][k]]) {
+                edge = edgeData[parallelEdgeDict[selectedEdge][k]];
 
                 edgeDescription = edgeDescription + 
                         '<li>Edge ID: ' + edge.name +
@@ -1014,7 +1092,9 @@ function selectEdge(edge, edgeId, edgeLen, edgeCov, edgeMulti) {
         }
     }
     else {
-        var edgeName = edgeData[selectedEdge].name;
+        // alignments, errors and overlaps of a copy are the same as of the edge loaded with another graph component
+        var selectedEdgeData = edgeData[selectedEdge];
+        var edgeName = selectedEdgeData.name;
         edgeDescription = 'Edge ID: ' + edgeName + ', length: ' + edgeLen + 'kb, coverage: ' + edgeCov + 'x, inferred multiplicity: ' + edgeMulti + '.';
         var row = $('#edgerow' + edgeName.replace('-', ''));
         if (row.length){
@@ -1023,7 +1103,7 @@ function selectEdge(edge, edgeId, edgeLen, edgeCov, edgeMulti) {
             var firstOffset = $('#collapse_edge_table').find('tbody tr:first').offset();
             $('#edge_table_div').scrollTop( row.offset().top - firstOffset.top);
         }
-        selectedEdge = edgeInfo[selectedEdge] ? selectedEdge : edgeData[selectedEdge].el_id;
+        selectedEdge = edgeInfo[selectedEdge] ? selectedEdge : selectedEdgeData.el_id;
         if (edgeInfo[selectedEdge]) {
             edgeDescription = edgeDescription + '<br/><b>Contigs:</b>';
             for (var i = 0; i < edgeInfo[selectedEdge].length; i++) {
@@ -1035,24 +1115,24 @@ function selectEdge(edge, edgeId, edgeLen, edgeCov, edgeMulti) {
             for (var i = 0; i < edgeMappingInfo[selectedEdge].length; i++) {
                 chrom = edgeMappingInfo[selectedEdge][i];
                 chromN = chromosomes.indexOf(chrom);
-                chromPos = edgeData[selectedEdge].aligns && edgeData[selectedEdge].aligns[chrom] ? edgeData[selectedEdge].aligns[chrom] : chrom;
+                chromPos = selectedEdgeData.aligns && selectedEdgeData.aligns[chrom] ? selectedEdgeData.aligns[chrom] : chrom;
                 edgeDescription = edgeDescription + '<li onclick="changeToChromosome(' + chromN + ')"> ' + chromPos + '</li>';
             }
-            if (edgeData[selectedEdge].aligns && edgeMappingInfo[selectedEdge].length === 3)
+            if (selectedEdgeData.aligns && edgeMappingInfo[selectedEdge].length === 3)
                 edgeDescription = edgeDescription + "Note: maximum top 3 alignments per chromosome are shown.<br/>";
         }
-        if (edgeData[selectedEdge] && edgeData[selectedEdge].errors && edgeData[selectedEdge].errors.length > 0) {
+        if (selectedEdgeData && selectedEdgeData.errors && selectedEdgeData.errors.length > 0) {
             edgeDescription = edgeDescription + '<br/><b>Misassembly breakpoints:</b>';
-            for (var i = 0; i < edgeData[selectedEdge].errors.length; i++) {
-                error = edgeData[selectedEdge].errors[i];
+            for (var i = 0; i < selectedEdgeData.errors.length; i++) {
+                error = selectedEdgeData.errors[i];
                 edgeDescription = edgeDescription + '<li> between ' + error[0] + ' ' + error[1] + ' and ' + error[2] + ' ' + error[3] + '</li>';
             }
         }
-        if (edgeData[selectedEdge] && edgeData[selectedEdge].overlaps && edgeData[selectedEdge].overlaps.length > 0) {
+        if (selectedEdgeData && selectedEdgeData.overlaps && selectedEdgeData.overlaps.length > 0) {
             var overlapsText = '<br/><b>Overlaps:</b>';
             var overlapsN = 0;
-            for (var i = 0; i < edgeData[selectedEdge].overlaps.length; i++) {
-                overlap = edgeData[selectedEdge].overlaps[i];
+            for (var i = 0; i < selectedEdgeData.overlaps.length; i++) {
+                overlap = selectedEdgeData.overlaps[i];
                 overlapEdgeName = overlap[0]; overlapEdgeId = overlap[1]; overlapLen = overlap[2];
                 if (checkEdge(overlapEdgeId)) {
                     overlapsText = overlapsText + '<li> ' + overlapEdgeName + ' (' + overlapLen + ')</li>';
@@ -170,8 +170,8 @@ function setupInterfaceBtns() {
 function addModeSwitch(){
     var div = "";
     var divWidth = 120;
-    if (Object.keys(refEdgeData).length) divWidth += 70;
-    if (Object.keys(contigEdgeData).length) divWidth += 50;
+    if (Object.keys(refEdgeSummary).length) divWidth += 70;
+    if (Object.keys(contigEdgeSummary).length) divWidth += 50;
     div += '<div style="padding-top:-30px; width:' + divWidth + 'px; text-align:center">Mode</div>';
     div += '<div class="btn-group btn-group-toggle" data-toggle="buttons">';
     div += '<label class="btn btn-info active option_mode" id="default_mode">';
@@ -180,12 +180,12 @@ function addModeSwitch(){
     div += '<label class="btn btn-info option_mode" id="repeat_mode">';
     div += '<input type="radio" name="mode" autocomplete="off" checked> repeat';
     div += '</label>';
-    if (Object.keys(refEdgeData).length) {
+    if (Object.keys(refEdgeSummary).length) {
         div += '<label class="btn btn-info option_mode" id="ref_mode">';
         div += '<input type="radio" name="mode" autocomplete="off" val="ref"> reference';
         div += '</label>';
     }
-    if (Object.keys(contigEdgeData).length) {
+    if (Object.keys(contigEdgeSummary).length) {
         div += '<label class="btn btn-info option_mode" id="contig_mode">';
         div += '<input type="radio" name="mode" autocomplete="off" val="contig"> contig';
         div += '</label>';
@@ -196,7 +196,7 @@ function addModeSwitch(){
 
 function addColorSelect(){
     var selectOptions = '<option value="0" selected>repeat edges</option>';
-    if (Object.keys(refEdgeData).length) {
+    if (Object.keys(refEdgeSummary).length) {
         selectOptions += '<option value="1">edge alignments to reference</option>';
         selectOptions += '<option value="2">erroneous edges</option>';
     }
@@ -227,6 +227,7 @@ function changeSplitMethod(method, component) {
         $('#refView').show();
         srcGraphs = ref_graphs;
         edgeData = refEdgeData;
+        edgeSummary = refEdgeSummary;
         srcPartDict = refPartitionDict;
         leafNodes = defLeafNodes;
         selectedChrom = 0;
@@ -241,6 +242,7 @@ function changeSplitMethod(method, component) {
         $('#refView').hide();
         srcGraphs = contig_graphs;
         edgeData = contigEdgeData;
+        edgeSummary = contigEdgeSummary;
         srcPartDict = null;
         selectedChrom = "";
     }
@@ -255,6 +257,7 @@ function changeSplitMethod(method, component) {
         srcGraphs = repeat_graphs;
         srcPartDict = repeatPartitionDict;
         edgeData = repeatEdgeData;
+        edgeSummary = repeatEdgeSummary;
         leafNodes = repeatLeafNodes;
     }
     else {
@@ -268,6 +271,7 @@ function changeSplitMethod(method, component) {
         $('#refView').hide();
         srcGraphs = def_graphs;
         edgeData = defEdgeData;
+        edgeSummary = defEdgeSummary;
         srcPartDict = defPartitionDict;
         leafNodes = defLeafNodes;
         selectedChrom = "";
@@ -354,15 +358,15 @@ function buildContigsTable() {
                 var edgeId = edge[0] == '-' ? 'rc' + edge.substr(1) : 'e' + edge;
                 //edgeId = getEdgeElement(edgeData[edgeElId]);
                  var edgeErrorsN = 0; // sum misassemblies in all edges
-                 if (edgeData[edgeId] && ((selectedMethod == "contig" && checkEdgeWithThresholds(edgeId)) || checkEdge(edgeId))) {
+                 if (edgeSummary[edgeId] && ((selectedMethod == "contig" && checkEdgeWithThresholds(edgeId)) || checkEdge(edgeId))) {
                     edgesN++;
-                    edgeErrorsN = edgeData[edgeId].errors.length;
+                    edgeErrorsN = getEdgeSummary(edgeId).errorsN;
                  }
                  else if (loopEdgeDict[edgeId]) {
                     var edgeChecked = false;
                     for (var k = 0; k < loopEdgeDict[edgeId].length; k++) {
                         if ((selectedMethod == "contig" && checkEdgeWithThresholds(loopEdgeDict[edgeId][k])) || checkEdge(loopEdgeDict[edgeId][k])) {
-                            edgeErrorsN += edgeData[loopEdgeDict[edgeId][k]].errors.length;
+                            edgeErrorsN += getEdgeSummary(loopEdgeDict[edgeId][k]).errorsN;
                             edgeChecked = true;
                         }
                     }
@@ -430,14 +434,14 @@ function buildRefTable() {
              chrom = edgeMappingInfo[edgeId][i];
              chromosomesData[chrom] = chromosomesData[chrom] || [];
              // calculate total length of edges mapped to the chromosome
-             if (edgeData[edgeId] && ((selectedMethod == "ref" && checkEdgeWithThresholds(edgeId)) || checkEdge(edgeId))) {
-                chromosomesData[chrom].push(edgeData[edgeId].len * 1000);
+             if (edgeSummary[edgeId] && ((selectedMethod == "ref" && checkEdgeWithThresholds(edgeId)) || checkEdge(edgeId))) {
+                chromosomesData[chrom].push(getEdgeSummary(edgeId).len * 1000);
              }
              else if (loopEdgeDict[edgeId]) {
                  var edgeLen = 0;
                  for (var k = 0; k < loopEdgeDict[edgeId].length; k++) {
                     if ((selectedMethod == "ref" && checkEdgeWithThresholds(loopEdgeDict[edgeId][k])) || checkEdge(loopEdgeDict[edgeId][k])) {
-                        edgeLen += edgeData[loopEdgeDict[edgeId][k]].len * 1000;
+                        edgeLen += getEdgeSummary(loopEdgeDict[edgeId][k]).len * 1000;
                     }
                  }
                  if (edgeLen > 0) chromosomesData[chrom].push(edgeLen);
@@ -516,11 +520,11 @@ function buildEdgesTable() {
     table += "<table border='1' id='edge_table' class='sortable scroll_table'>";
     table += "<thead><tr class='header'><th>Edge</th><th>Len (kbp)</th><th>Cov</th><th>Mult.</th></tr></thead><tbody>";
     enableEdges = [];
-    for (x in edgeData) {
+    for (x in edgeSummary) {
         // add only forward edges satisfied with length/depth thresholds
-        if (edgeData[x].name.toString()[0] != '-' && x.indexOf('_') == -1 && checkEdge(x) && 
-            (selectedMethod != "ref" || !isNaN(parseInt(refEdgeData[x].ref_comp)))) {
-            enableEdges.push(defEdgeData[x] || edgeData[x]);
+        if (x[0] == 'e' && x.indexOf('_') == -1 && checkEdge(x) &&
+            (selectedMethod != "ref" || getEdgeComponent(x) !== null)) {
+            enableEdges.push(getEdgeSummary(x));
         }
     }
     enableEdges.sort(function(a, b) {
@@ -587,7 +591,7 @@ function buildVertexTable() {
                 if (diGraph[node] && diGraph[node][node2] && diGraph[node][node2].has(edgeId)) {
                     if (diGraph[node2] && diGraph[node2][node] && diGraph[node2][node].has(edgeId)) {
                         // calculate loop edges in the node
-                        if (edgeData[edgeId] && checkEdge(edgeId))
+                        if (edgeSummary[edgeId] && checkEdge(edgeId))
                             nodeInfo['loop']++;
                         else if (loopEdgeDict[edgeId]) {
                             for (var k = 0; k < loopEdgeDict[edgeId].length; k++) {
@@ -596,12 +600,13 @@ function buildVertexTable() {
                         }
                     }
                     else {
-                        edgeRealId = edgeInfo[edgeId] ? edgeId : (edgeData[edgeId] ? edgeData[edgeId].el_id : edgeId);
+                        edgeRealId = edgeInfo[edgeId] ? edgeId : (edgeSummary[edgeId] ? getEdgeSummary(edgeId).el_id : edgeId);
                         // calculate node outdegree
-                        if (edgeData[edgeRealId] && checkEdge(edgeRealId)) {
+                        if (edgeSummary[edgeRealId] && checkEdge(edgeRealId)) {
+                            edge = getEdgeSummary(edgeRealId);
                             nodeInfo['out']++;
-                            nodeInfo['out_mult'] = nodeInfo['out_mult'] + edgeData[edgeRealId].mult;
-                            outCoverage += edgeData[edgeRealId].cov;
+                            nodeInfo['out_mult'] = nodeInfo['out_mult'] + edge.mult;
+                            outCoverage += edge.cov;
                         }
                     }
                 }
@@ -609,12 +614,13 @@ function buildVertexTable() {
                     if (diGraph[node] && diGraph[node][node2] && diGraph[node][node2].has(edgeId)) {
                     }
                     else {
-                        edgeRealId = edgeInfo[edgeId] ? edgeId : (edgeData[edgeId] ? edgeData[edgeId].el_id : edgeId);
+                        edgeRealId = edgeInfo[edgeId] ? edgeId : (edgeSummary[edgeId] ? getEdgeSummary(edgeId).el_id : edgeId);
                         // calculate node indegree
-                        if (edgeData[edgeRealId] && checkEdge(edgeRealId)) {
+                        if (edgeSummary[edgeRealId] && checkEdge(edgeRealId)) {
+                            edge = getEdgeSummary(edgeRealId);
                             nodeInfo['in']++;
-                            nodeInfo['in_mult'] = nodeInfo['in_mult'] + edgeData[edgeRealId].mult;
-                            inCoverage += edgeData[edgeRealId].cov;
+                            nodeInfo['in_mult'] = nodeInfo['in_mult'] + edge.mult;
+                            inCoverage += edge.cov;
                         }
                     }
                 }
@@ -663,56 +669,51 @@ function buildComponentsTable() {
     for (i = 0; i < srcGraphs.length; i++) {
         var componentInfo = {};
         componentInfo['id'] = i;
-        dotSrc = srcGraphs[i].dot;
         componentInfo['unique'] = 0;
         componentInfo['repeat'] = 0;
         componentInfo['len'] = 0;
-        var dotSrcLines = dotSrc.split('\n');
-        var filteredDotLines = [];
+        // ids of the component edges are listed in the index of components
+        var componentEdges = srcGraphs[i].edges;
+        var filteredEdges = [];
         var loopEdges = new Set();
         var loopRepeatEdges = new Set();
-        for (j = 0; j < dotSrcLines.length; j++) {
-            var matches = dotSrcLines[j].match(idPattern);
-            if(matches && matches.length > 1) {
-                edgeId = matches[1];
-                edgeRealId = edgeInfo[edgeId] ? edgeId : (edgeData[edgeId] ? edgeData[edgeId].el_id : edgeId);
-                if (checkEdge(edgeRealId, i)) {
-                    if (edgeData[edgeRealId].s === edgeData[edgeRealId].e) {
-                        if (edgeData[edgeRealId].unique) loopEdges.add(edgeRealId.replace('e', '').replace('rc', ''));
-                        else loopRepeatEdges.add(edgeRealId.replace('e', '').replace('rc', ''));
-                    }
-                    else {
-                        if (edgeData[edgeRealId].unique) componentInfo['unique']++;
-                        else componentInfo['repeat']++;
-                    }
-
-                    var matches = dotSrcLines[j].match(lenCovPattern);
-                    if (matches && matches.length > 2) {
-                        edge_len = parseFloat(matches[1]);
-                        componentInfo['len'] = componentInfo['len'] + edge_len;
-                    }
-                    filteredDotLines.push(dotSrcLines[j]);
+        for (j = 0; j < componentEdges.length; j++) {
+            edgeId = componentEdges[j];
+            var componentEdge = getEdgeSummary(edgeId);
+            edgeRealId = edgeInfo[edgeId] ? edgeId : (componentEdge ? componentEdge.el_id : edgeId);
+            if (checkEdge(edgeRealId, i)) {
+                edge = getEdgeSummary(edgeRealId);
+                if (edge.s === edge.e) {
+                    if (edge.unique) loopEdges.add(edgeRealId.replace('e', '').replace('rc', ''));
+                    else loopRepeatEdges.add(edgeRealId.replace('e', '').replace('rc', ''));
                 }
-                else if (baseLoopEdgeDict[edgeId]) {
-                    var loopEdgesCount = 0;
-                    for (var k = 0; k < baseLoopEdgeDict[edgeId].length; k++) {
-                        if (checkEdge(baseLoopEdgeDict[edgeId][k], i)) {
-                            loopEdgesCount++;
-                            edge = edgeData[baseLoopEdgeDict[edgeId][k]];
-                            if (edge.unique) loopEdges.add(edgeId);
-                            else loopRepeatEdges.add(edgeId);
-                            componentInfo['len'] = componentInfo['len'] + edge.len;
-                        }
+                else {
+                    if (edge.unique) componentInfo['unique']++;
+                    else componentInfo['repeat']++;
+                }
+
+                if (componentEdge)
+                    componentInfo['len'] = componentInfo['len'] + componentEdge.len;
+                filteredEdges.push([edgeId, componentEdge ? componentEdge.s : edge.s, componentEdge ? componentEdge.e : edge.e]);
+            }
+            else if (baseLoopEdgeDict[edgeId]) {
+                var loopEdgesCount = 0;
+                for (var k = 0; k < baseLoopEdgeDict[edgeId].length; k++) {
+                    if (checkEdge(baseLoopEdgeDict[edgeId][k], i)) {
+                        loopEdgesCount++;
+                        edge = getEdgeSummary(baseLoopEdgeDict[edgeId][k]);
+                        if (edge.unique) loopEdges.add(edgeId);
+                        else loopRepeatEdges.add(edgeId);
+                        componentInfo['len'] = componentInfo['len'] + edge.len;
                     }
-                    if (loopEdgesCount) filteredDotLines.push(dotSrcLines[j]);
                 }
+                if (loopEdgesCount) filteredEdges.push([edgeId, edge.s, edge.s]);
             }
-            else filteredDotLines.push(dotSrcLines[j]);
         }
         componentInfo['unique'] = componentInfo['unique'] + loopEdges.size;
         componentInfo['repeat'] = componentInfo['repeat'] + loopRepeatEdges.size;
         if (selectedMethod == "ref")
-            componentInfo['n'] = calculateComponents(parseGraph(filteredDotLines), true);  // show number of connected components
+            componentInfo['n'] = calculateComponents(parseEdgeList(filteredEdges));  // show number of connected components
         componentInfo['enter'] = srcGraphs[i].enters;
         componentInfo['exit'] = srcGraphs[i].exits;
         maxEnters = Math.max(maxEnters, srcGraphs[i].enters);
@@ -827,7 +828,7 @@ function selectNode(selectedNode) {
                 d3.select('#' + edgeId).classed('node_selected_in', true);
                 if ((selectedMethod != "repeat" && bigEdge.comp == componentN) || (selectedMethod == "repeat" && bigEdge.rep_comp == componentN)) {
                     for (var k = 0; k < parallelEdgeDict[edgeId].length; k++) {
-                        if (defEdgeData[parallelEdgeDict[edgeId][k]]) {
+                        if (edgeData[parallelEdgeDict[edgeId][k]]) {
                             edge = edgeData[parallelEdgeDict[edgeId][k]];
                             if ((selectedMethod != "repeat" && edge.comp == componentN) || (selectedMethod == "repeat" && edge.rep_comp == componentN))
                                 inEdges.push(edge);
@@ -873,7 +874,7 @@ function selectNode(selectedNode) {
                 var edges = Array.from(adjEdges[adjNodes[i]]);
                 for (var j = 0; j < edges.length; j++) {
                     edgeId = edges[j];
-                    edge = defEdgeData[edgeId];
+                    edge = edgeData[edgeId];
                     //console.log(edge)
                     if (selectedNode == adjNodes[i]) {
                         if (edgeId.lastIndexOf('loop', 0) === 0) {
@@ -1062,9 +1063,9 @@ function setupAutocompleteSearch(){
 
 function createAutocompleteListItems() {
     var autocompleteItems = [];
-    for (x in edgeData) {
-        if (edgeData[x].name.toString()[0] !== '-' && x.indexOf('_') === -1) {
-            edge = defEdgeData[x] || edgeData[x];
+    for (x in edgeSummary) {
+        if (x[0] === 'e' && x.indexOf('_') === -1) {
+            edge = getEdgeSummary(x);
             autocompleteItems.push({
                 label: edge.name,
                 value: 'edge,' + edge.name,
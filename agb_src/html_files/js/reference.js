@@ -103,7 +103,7 @@ function updateRefView() {
                    misassembliesText = misTypes.join(', ')
                }
                else misassembliesText = "No misassemblies";
-               tooltipDiv.html("<b>Edge:</b> " + edgeData[align.edge].name +
+               tooltipDiv.html("<b>Edge:</b> " + getEdgeName(align.edge) +
                    "<br> <b>Aligned to:</b> " + align.s + "-" + align.e +
                    "<br> " + misassembliesText)
                  .style("left", (d3.event.pageX) + "px")
@@ -131,9 +131,9 @@ function updateRefView() {
 
 function selectAlign(align, selectedAlign) {
     deselectEdge();
-    if (edgeData[align.edge]) {
-        edge = edgeData[align.edge];
-        edgeLink = '<a onclick="selectEdgeByLabel(\'' + edge.name + '\')">' + edge.name + '</a>';
+    if (edgeSummary[align.edge]) {
+        var edgeName = getEdgeName(align.edge);
+        edgeLink = '<a onclick="selectEdgeByLabel(\'' + edgeName + '\')">' + edgeName + '</a>';
     }
     else edgeLink = align.edge;
     d3.selectAll('.align').classed("selected", false);
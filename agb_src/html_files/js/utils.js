@@ -46,6 +46,24 @@ function parseGraph(srcLines, skipIds) {
     return g;
 }
 
+function parseEdgeList(edges) {
+    // build a graph from the list of component edges [id, start, end] to calculate connected components
+    var g = {};
+    for (var i = 0; i < edges.length; i++) {
+        var node1 = edges[i][1], node2 = edges[i][2];
+        g[node1] = g[node1] || {};
+        g[node2] = g[node2] || {};
+        g[node1][node2] = g[node1][node2] || new Set();
+        g[node2][node1] = g[node2][node1] || new Set();
+    }
+    return g;
+}
+
+function getEdgeName(edgeId) {
+    // e12 -> 12, rc12 -> -12
+    return edgeId[0] == 'e' ? edgeId.substr(1) : '-' + edgeId.substr(2);
+}
+
 function parseDirectedGraph(srcLines) {
     // parse DOT file taking into account edge directions
     var g = {};
@@ -17,7 +17,6 @@ MAX_NODES = 300     # split graph into smaller subgraphs if the number of nodes
 GAP_THRESHOLD = 1000
 
 ROOT_DIR = abspath(dirname(dirname(realpath(__file__))))
-TOOLS_DIR = join(ROOT_DIR, "external_tools")
 HTML_DIR = join(ROOT_DIR, "html_files")
 CSS_DIR = join(HTML_DIR, "css")
 JS_DIR = join(HTML_DIR, "js")
@@ -26,4 +25,10 @@ HTML_NAME = "viewer.html"
 
 DEFAULT_THREADS = 4
 
+COMPRESSION_SUFFIXES = ['.gz', '.bgz', '.zst']
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+ZSTD_READ_SIZE = 128 * 1024  # compressed bytes decompressed at once
+ZSTD_BUFFER_SIZE = 1024 * 1024
+
 
@@ -0,0 +1,55 @@
+import re
+
+from agb_src.scripts.config import ABYSS_NAME, FLYE_NAME
+
+DOT_ID = r'"(?:[^"\\]|\\.)*"|[\w.]+[+-]?(?!>)'
+statement_pattern = re.compile(r'\s*(%s)\s*(?:->\s*(%s)\s*)?(?:\[(.*)\])?\s*;?\s*$' % (DOT_ID, DOT_ID), re.S)
+attr_pattern = re.compile(r'([\w.]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^\s,;\]]+)')
+
+DEFAULT_ATTR_STATEMENTS = {'graph', 'node', 'edge'}
+
+
+def iter_dot_statements(f):
+    '''
+    Iterates over node and edge statements of GraphViz file written by assemblers (one statement per line, attribute lists can span several lines):
+    ('node', (node_id,), attrs), ('edge', (start_id, end_id), attrs) and ('default', (graph|node|edge,), attrs).
+    IDs and attribute values are returned without quotes. Other statements are skipped.
+    '''
+    statement = ''
+    for line in f:
+        statement += line
+        if '[' in statement and ']' not in statement:  # attribute list continues on the next line
+            continue
+        match = statement_pattern.match(statement)
+        statement = ''
+        if not match:
+            continue
+        start, end, attr_list = match.groups()
+        attrs = parse_dot_attrs(attr_list) if attr_list else dict()
+        if end is not None:
+            yield 'edge', (unquote(start), unquote(end)), attrs
+        elif start in DEFAULT_ATTR_STATEMENTS:
+            yield 'default', (start,), attrs
+        else:
+            yield 'node', (unquote(start),), attrs
+
+
+def parse_dot_attrs(attr_list):
+    return dict((key, unquote(value)) for key, value in attr_pattern.findall(attr_list))
+
+
+def unquote(dot_id):
+    if dot_id[0] == '"':
+        return dot_id[1:-1]
+    return dot_id
+
+
+def get_dot_dialect(statement_type, ids, attrs):
+    # ABySS uses signed node ids and length attributes, Flye puts edge ids in labels
+    if statement_type == 'node' and 'l' in attrs:
+        return ABYSS_NAME
+    if statement_type == 'edge':
+        if ids[0][-1] in '+-' and ids[0][:-1].isdigit():
+            return ABYSS_NAME
+        if attrs.get('label', '').startswith('id '):
+            return FLYE_NAME
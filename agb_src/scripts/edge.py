@@ -1,4 +1,13 @@
+from agb_src.scripts.utils import format_edge_id, edge_id_to_name, get_coverage_stats
+
+
 class Edge:
+    # millions of edges are kept in memory, so attributes are stored in slots and
+    # errors, overlaps and alignments are allocated only for edges that have them
+    __slots__ = ('id', 'element_id', 'name', 'length', 'cov', 'start', 'end', 'is_complex_loop', 'multiplicity',
+                 'color', 'chrom', 'repetitive', 'two_way', 'component', 'ref_component', 'repeat_component',
+                 'errors', 'overlaps', 'aligns')
+
     def __init__(self, id, name=None, length=None, coverage=None, multiplicity=None,
                  color=None, chrom=None, repetitive=False, element_id=None):
         self.id = id
@@ -17,15 +26,38 @@ class Edge:
         self.component = None
         self.ref_component = None
         self.repeat_component = None
-        self.errors = []
-        self.overlaps = []
-        self.aligns = dict()
+        self.errors = None
+        self.overlaps = None
+        self.aligns = None
+
+    def add_error(self, error):
+        if self.errors is None:
+            self.errors = []
+        self.errors.append(error)
+
+    def add_overlap(self, overlap):
+        if self.overlaps is None:
+            self.overlaps = []
+        self.overlaps.append(overlap)
+
+    def add_align(self, chrom, align):
+        if self.aligns is None:
+            self.aligns = dict()
+        self.aligns[chrom] = align
 
     def as_dict(self):
-        return {'id': self.id, 'el_id': self.element_id, 'name': self.name, 'len': self.format_len(), 'cov': self.cov,
+        edge_id = format_edge_id(self.id)
+        overlaps = [(edge_id_to_name(e), format_edge_id(e), overlap) for e, overlap in self.overlaps or []]
+        return {'id': edge_id, 'el_id': self.element_id or edge_id, 'name': self.name, 'len': self.format_len(), 'cov': self.cov,
                 's': self.start, 'e': self.end, 'mult': self.multiplicity, 'color': self.color, 'unique': not self.repetitive,
                 'chrom': self.chrom, 'comp': self.component, 'rep_comp': self.repeat_component,
-                'ref_comp': self.ref_component, 'errors': self.errors, 'overlaps': self.overlaps, 'aligns': self.aligns}
+                'ref_comp': self.ref_component, 'errors': self.errors or [], 'overlaps': overlaps,
+                'aligns': self.aligns or dict()}
+
+    def as_summary(self, component):
+        # [len, cov, component, mult, unique, start, end, number of errors]
+        return [self.format_len(), self.cov, component, self.multiplicity, not self.repetitive, self.start, self.end,
+                len(self.errors) if self.errors else 0]
 
     def format_len(self):
         if not self.length:
@@ -36,18 +68,77 @@ class Edge:
             return int(self.length / 1000)
 
     def print_edge_to_dot(self, id=None):
-        edge_id = id or self.id
         if self.is_complex_loop:
             s = '"%s" -> "%s" [label = "", id = "%s", color = "%s", penwidth=5] ;\n' % \
-                (self.start, self.end, edge_id, self.color or "black")
+                (self.start, self.end, id or self.id, self.color or "black")
         else:
             l = str(self.format_len()) + 'k'
+            edge_id = format_edge_id(self.id)
             s = '"%s" -> "%s" [label = id %s\\l%s %dx(%d), id = "%s", color = "%s"] ;\n' % \
-                (self.start, self.end, self.id, l, self.cov, self.multiplicity, edge_id, self.color)
+                (self.start, self.end, edge_id, l, self.cov, self.multiplicity, id or edge_id, self.color)
         return s
 
     def create_copy(self, start, end):
-        edge = Edge(self.id, self.name, self.length, self.cov, self.multiplicity, self.color,
-                    self.chrom, self.repetitive, element_id=self.id)
-        edge.start, edge.end, edge.errors, edge.overlaps, edge.aligns = start, end, self.errors, self.overlaps, self.aligns
-        return edge
\ No newline at end of file
+        return EdgeView(self, start, end)
+
+
+def shared_edge_attr(name):
+    return property(lambda view: getattr(view.edge, name))
+
+
+class EdgeView:
+    # placement of the edge in one graph component of one viewer mode.
+    # Only the position and component ids are stored, the rest is read from the shared edge
+    __slots__ = ('edge', 'element_id', 'start', 'end', 'is_complex_loop', 'component', 'ref_component', 'repeat_component')
+
+    def __init__(self, edge, start, end):
+        self.edge = edge
+        self.element_id = None
+        self.start = start
+        self.end = end
+        self.is_complex_loop = False
+        self.component = None
+        self.ref_component = None
+        self.repeat_component = None
+
+    id = shared_edge_attr('id')
+    name = shared_edge_attr('name')
+    length = shared_edge_attr('length')
+    cov = shared_edge_attr('cov')
+    multiplicity = shared_edge_attr('multiplicity')
+    color = shared_edge_attr('color')
+    chrom = shared_edge_attr('chrom')
+    repetitive = shared_edge_attr('repetitive')
+    two_way = shared_edge_attr('two_way')
+    errors = shared_edge_attr('errors')
+    overlaps = shared_edge_attr('overlaps')
+    aligns = shared_edge_attr('aligns')
+
+    as_dict = Edge.as_dict
+    as_summary = Edge.as_summary
+    format_len = Edge.format_len
+    print_edge_to_dot = Edge.print_edge_to_dot
+
+    def create_copy(self, start, end):
+        return EdgeView(self.edge, start, end)
+
+
+class EdgeDict(dict):
+    # edges by id. Length-weighted coverage statistics are computed on the first request
+    # and kept until an edge is added or removed (coverage of edges should be set before the request)
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.coverage_stats = None
+
+    def __setitem__(self, edge_id, edge):
+        dict.__setitem__(self, edge_id, edge)
+        self.coverage_stats = None
+
+    def __delitem__(self, edge_id):
+        dict.__delitem__(self, edge_id)
+        self.coverage_stats = None
+
+    def get_coverage_stats(self):
+        if self.coverage_stats is None:
+            self.coverage_stats = get_coverage_stats(self.values())
+        return self.coverage_stats
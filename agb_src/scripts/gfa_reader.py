@@ -0,0 +1,288 @@
+import mmap
+import os
+import re
+import shutil
+from itertools import chain
+from multiprocessing import Pool
+
+from agb_src.scripts.utils import is_compressed, open_file
+
+CHUNK_SIZE = 1 << 20  # max number of bytes kept in memory for one GFA line
+PARALLEL_MIN_SIZE = 64 * 1024 * 1024  # smaller files are parsed in one process
+RANGES_PER_WORKER = 4
+
+NUCLEOTIDES = b'ACGTNacgtn'
+
+
+class EdgeSeqWriter:
+    # writes S-line sequences to FASTA file chunk by chunk, without keeping the whole sequence in memory
+    def __init__(self, out_f, min_len, get_seq_header):
+        self.out_f = out_f
+        self.min_len = min_len
+        self.get_seq_header = get_seq_header
+        self.record_start = None
+
+    def write_seq(self, name, seq):
+        if len(seq) >= self.min_len:
+            self.out_f.write(b">" + self.get_seq_header(name).encode() + b"\n")
+            self.out_f.write(seq)
+            self.out_f.write(b"\n")
+
+    def start_seq(self, name):
+        self.record_start = self.out_f.tell()
+        self.out_f.write(b">" + self.get_seq_header(name).encode() + b"\n")
+
+    def write_chunk(self, seq_chunk):
+        self.out_f.write(seq_chunk)
+
+    def finish_seq(self, seq_len):
+        if seq_len < self.min_len:
+            self.out_f.seek(self.record_start)
+            self.out_f.truncate()
+        else:
+            self.out_f.write(b"\n")
+        self.record_start = None
+
+
+def read_gfa(gfa_fpath, workers=1, seq_fpath=None, min_seq_len=0, get_seq_header=None):
+    '''
+    Yields GFA records in the file order: ('S', (name, seq_len, tags)) for segments,
+    ('L'/'E', (from_name, from_orient, to_name, to_orient, overlap)) for links and (record_type, fields) for the rest.
+    Large files are memory-mapped, split into line-aligned byte ranges and parsed by several processes.
+    Segment sequences are written to seq_fpath (if specified) in the same pass.
+    '''
+    if workers <= 1 or os.path.getsize(gfa_fpath) < PARALLEL_MIN_SIZE or is_compressed(gfa_fpath):
+        for record in iter_gfa_range(gfa_fpath, 0, None, seq_fpath, min_seq_len, get_seq_header, threads=workers):
+            yield record
+        return
+
+    ranges = split_file_by_lines(gfa_fpath, workers * RANGES_PER_WORKER)
+    jobs = []
+    for i, (start, end) in enumerate(ranges):
+        part_seq_fpath = seq_fpath + ".part%d" % i if seq_fpath else None
+        jobs.append((gfa_fpath, start, end, part_seq_fpath, min_seq_len, get_seq_header))
+    pool = Pool(workers)
+    try:
+        # records of byte ranges are passed on in the file order as soon as they are parsed
+        for record in chain.from_iterable(pool.imap(parse_gfa_range_job, jobs, chunksize=1)):
+            yield record
+    finally:
+        pool.close()
+        pool.join()
+    if seq_fpath:
+        with open(seq_fpath, "wb") as out_f:
+            for job in jobs:
+                part_seq_fpath = job[3]
+                with open(part_seq_fpath, "rb") as f:
+                    shutil.copyfileobj(f, out_f)
+                os.remove(part_seq_fpath)
+
+
+def split_file_by_lines(fpath, num_ranges):
+    file_size = os.path.getsize(fpath)
+    range_size = max(1, file_size // num_ranges)
+    boundaries = [0]
+    with open(fpath, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for i in range(1, num_ranges):
+                pos = max(boundaries[-1], i * range_size)
+                line_end = mm.find(b'\n', pos - 1) if pos > 0 else -1
+                pos = line_end + 1 if line_end != -1 else file_size
+                boundaries.append(pos)
+        finally:
+            mm.close()
+    boundaries.append(file_size)
+    return [(start, end) for start, end in zip(boundaries[:-1], boundaries[1:]) if end > start]
+
+
+def parse_gfa_range_job(job):
+    return list(iter_gfa_range(*job))
+
+
+def iter_gfa_range(gfa_fpath, start, end, seq_fpath=None, min_seq_len=0, get_seq_header=None, threads=1):
+    seq_out = open(seq_fpath, "wb") if seq_fpath else None
+    seq_writer = EdgeSeqWriter(seq_out, min_seq_len, get_seq_header) if seq_out else None
+    try:
+        with open_file(gfa_fpath, "rb", threads=threads) as f:
+            if start:
+                f.seek(start)
+            for record_type, fs in iter_gfa_records(f, seq_writer, end_offset=end):
+                if record_type == 'L' or record_type == 'E':
+                    yield record_type, parse_link(record_type, fs)
+                else:
+                    yield record_type, fs
+    finally:
+        if seq_out:
+            seq_out.close()
+
+
+def parse_link(record_type, fs):
+    if record_type == 'L':
+        _, from_name, from_orient, to_name, to_orient = fs[:5]
+    else:
+        # E       *       2+      65397+  21      68$     0       47      47M
+        from_name, to_name = fs[2], fs[3]
+        from_orient, to_orient = from_name[-1], to_name[-1]
+        from_name, to_name = from_name[:-1], to_name[:-1]
+    overlap = 0
+    overlap_operations = re.split('(\d+)', fs[-1])
+    for i in range(0, len(overlap_operations) - 1, 1):
+        if not overlap_operations[i]:
+            continue
+        if overlap_operations[i+1] == 'M' or overlap_operations[i+1] == 'I':
+            overlap += int(overlap_operations[i])
+    return from_name, from_orient, to_name, to_orient, overlap
+
+
+def iter_gfa_records(f, seq_writer=None, end_offset=None):
+    '''
+    Iterates over records of GFA file opened in binary mode (up to end_offset, if specified).
+    S records are returned as ('S', (name, seq_len, tags)), where tags is a dict with lowercase tag names.
+    Segment sequences are skipped (or streamed to seq_writer) and never split or copied as a whole.
+    Other records are returned as (record_type, fields).
+    '''
+    while end_offset is None or f.tell() < end_offset:
+        chunk = f.readline(CHUNK_SIZE)
+        if not chunk:
+            break
+        if chunk[:1] == b'S' and b'\t' in chunk:
+            yield 'S', read_segment(f, chunk, seq_writer)
+            continue
+        line = chunk
+        while not line.endswith(b'\n'):
+            next_chunk = f.readline(CHUNK_SIZE)
+            if not next_chunk:
+                break
+            line += next_chunk
+        fs = line.decode().split()
+        if not fs:
+            continue
+        if fs[0] == 'S':  # segment line with space-separated fields
+            yield 'S', parse_segment_fields(fs, seq_writer)
+            continue
+        yield fs[0], fs
+
+
+def parse_segment_fields(fs, seq_writer=None):
+    name, seq = fs[1], fs[2]
+    tag_fields = fs[3:]
+    seq_len = None
+    if len(fs) > 3 and seq.isdigit():  # GFA2: S <sid> <slen> <sequence>
+        seq_len = int(seq)
+        seq = fs[3]
+        tag_fields = fs[4:]
+    if seq != '*':
+        seq_len = len(seq)
+    if seq_writer and seq[0] in 'ACGTNacgtn':
+        seq_writer.write_seq(name, seq.encode())
+    return name, seq_len, parse_tags(tag_fields)
+
+
+def read_segment(f, chunk, seq_writer=None):
+    # find field boundaries by tab offsets, sequence can be spread across several chunks
+    at_eof = False
+    while not chunk.endswith(b'\n') and is_cut_segment_head(chunk):
+        # the name, the length field or the empty sequence is cut by the chunk border
+        next_chunk = f.readline(CHUNK_SIZE)
+        if not next_chunk:
+            at_eof = True
+            break
+        chunk += next_chunk
+    name_end = chunk.find(b'\t', 2)
+    if name_end == -1:
+        name_end = len(chunk.rstrip(b'\r\n'))
+    name = chunk[2:name_end].decode()
+    seq_start = name_end + 1
+    field_end = find_field_end(chunk, seq_start)
+    if field_end == -1 and at_eof:
+        # the last line without the line break
+        field_end = len(chunk.rstrip(b'\r'))
+    segment_len = None
+    if field_end != -1 and chunk[seq_start:field_end].isdigit() and chunk[field_end:field_end + 1] == b'\t':
+        # GFA2: S <sid> <slen> <sequence>, skip the length field
+        segment_len = int(chunk[seq_start:field_end])
+        seq_start = field_end + 1
+        field_end = find_field_end(chunk, seq_start)
+
+    is_seq = seq_start < len(chunk) and chunk[seq_start] in NUCLEOTIDES
+    if field_end != -1:
+        # the whole sequence is inside the chunk
+        seq_len = field_end - seq_start
+        if chunk[seq_start:field_end] == b'*':
+            seq_len = segment_len
+        if seq_writer and is_seq:
+            seq_writer.write_seq(name, chunk[seq_start:field_end])
+        tail = chunk[field_end:]
+    else:
+        seq_len = 0
+        seq_chunk = chunk[seq_start:]
+        if seq_writer and is_seq:
+            seq_writer.start_seq(name)
+        tail = b''
+        while True:
+            # the line break can be split by the chunk border, keep the trailing \r until the next chunk
+            has_cr = seq_chunk.endswith(b'\r')
+            if has_cr:
+                seq_chunk = seq_chunk[:-1]
+            seq_len += len(seq_chunk)
+            if seq_writer and is_seq:
+                seq_writer.write_chunk(seq_chunk)
+            chunk = f.readline(CHUNK_SIZE)
+            if not chunk:
+                break
+            if has_cr and not chunk.startswith(b'\n'):
+                seq_len += 1
+                if seq_writer and is_seq:
+                    seq_writer.write_chunk(b'\r')
+            field_end = find_field_end(chunk, 0)
+            if field_end == -1:
+                seq_chunk = chunk
+                continue
+            seq_len += field_end
+            if seq_writer and is_seq:
+                seq_writer.write_chunk(chunk[:field_end])
+            tail = chunk[field_end:]
+            break
+        if seq_writer and is_seq:
+            seq_writer.finish_seq(seq_len)
+    # read the rest of the line with optional tags
+    while tail and not tail.endswith(b'\n'):
+        chunk = f.readline(CHUNK_SIZE)
+        if not chunk:
+            break
+        tail += chunk
+    return name, seq_len, parse_tags(tail.decode().split())
+
+
+def is_cut_segment_head(chunk):
+    name_end = chunk.find(b'\t', 2)
+    if name_end == -1:
+        return True
+    field_start = chunk[name_end + 1:name_end + 64].rstrip(b'\r')
+    if not field_start or field_start == b'*' or field_start.isdigit():
+        return True
+    field_end = field_start.find(b'\t')
+    if field_end != -1 and field_start[:field_end].isdigit():  # GFA2 length field
+        return is_cut_segment_head(b'S\t\t' + field_start[field_end + 1:])
+    return False
+
+
+def find_field_end(chunk, start):
+    # position of the tab or the line break after the field, -1 if the field continues in the next chunk
+    tab_pos = chunk.find(b'\t', start)
+    if tab_pos != -1:
+        return tab_pos
+    if chunk.endswith(b'\r\n'):
+        return len(chunk) - 2
+    if chunk.endswith(b'\n'):
+        return len(chunk) - 1
+    return -1
+
+
+def parse_tags(tag_fields):
+    tags = dict()
+    for field in tag_fields:
+        fs = field.split(':')
+        tags[fs[0].lower()] = fs[-1]
+    return tags
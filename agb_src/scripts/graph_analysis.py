@@ -1,24 +1,34 @@
+import io
 import json
 import math
-from os.path import join
+import multiprocessing
+import os
+import shutil
+from os.path import join, exists
 from collections import defaultdict
 
-import nxmetis
 import networkx as nx
 
 from agb_src.scripts.config import MAX_NODES, MAX_SUB_NODES
-from agb_src.scripts.edge import Edge
-from agb_src.scripts.utils import print_dot_header, natural_sort, get_match_edge_id, is_flye
+from agb_src.scripts.edge import Edge, EdgeView
+from agb_src.scripts.graph_components import get_weakly_connected_components
+from agb_src.scripts.graph_layout import format_layout_edge, get_layout_dot, compute_layouts
+from agb_src.scripts.partitioner import partition_graph
+from agb_src.scripts.utils import print_dot_header, natural_sort, get_match_edge_id, is_rc_edge, is_flye, format_edge_id
 from agb_src.scripts.viewer_data import ViewerData
 
+PARALLEL_MIN_NODES = 10000  # components of smaller graphs are split in one process
+
+split_jobs = None  # components and read-only graph data shared with the forked worker processes
+
 
 def process_graph(g, undirected_g, dict_edges, edges_by_nodes, two_way_edges, output_dirpath, suffix, assembler,
-                  base_graph=None, contig_edges=None, chrom_names=None, edge_by_chrom=None, mapping_info=None):
-    last_idx = 0
+                  base_graph=None, contig_edges=None, chrom_names=None, edge_by_chrom=None, mapping_info=None,
+                  threads=1, partitioner=None, layout_cache_dirpath=None):
     parts_info = dict()
     graph = []
     modified_dict_edges = dict()
-    loop_edges = defaultdict(set)
+    loop_edges = defaultdict(list)
     hanging_nodes = []
     connected_nodes = []
     enters = []
@@ -31,23 +41,25 @@ def process_graph(g, undirected_g, dict_edges, edges_by_nodes, two_way_edges, ou
     if suffix == "ref":
         if chrom_names:
             ## create graph for reference-based mode
-            for chrom in list(natural_sort(chrom_names)):
+            components = []
+            chroms = list(natural_sort(chrom_names))
+            for chrom in chroms:
                 edges = edge_by_chrom[chrom]  # use only edges mapped to the chromosome
                 graph_component = nx.DiGraph()
                 for edge_id in set(edges):
                     graph_component.add_edge(dict_edges[edge_id].start, dict_edges[edge_id].end)
-                viewer_data, last_idx, sub_complex_component = \
-                    split_graph(graph_component, g, undirected_g, dict_edges, modified_dict_edges, loop_edges, edges_by_nodes,
-                                two_way_edges, last_idx, parts_info, mapping_info=mapping_info, chrom=chrom)
-                parts_info = viewer_data.parts_info
+                components.append((graph_component, {'chrom': chrom}))
+            results = split_components(components, g, undirected_g, dict_edges, modified_dict_edges, loop_edges,
+                                       edges_by_nodes, two_way_edges, parts_info, threads, mapping_info=mapping_info,
+                                       partitioner=partitioner)
+            for chrom, (viewer_data, sub_complex_component) in zip(chroms, results):
                 graph.extend(viewer_data.g)
                 for i in range(len(viewer_data.g)):
                     chrom_list.append(chrom)
                 complex_component = complex_component or sub_complex_component
-        with open(join(output_dirpath, 'reference.json'), 'a') as handle:
-            handle.write("chromosomes=" + json.dumps(chrom_list) + ";\n")
     elif contig_edges and suffix == "contig":
         ## create graph for contig-focused mode
+        components = []
         for contig, edges in contig_edges.items():
             graph_component = nx.DiGraph()
             edge_ids = set()
@@ -60,41 +72,38 @@ def process_graph(g, undirected_g, dict_edges, edges_by_nodes, two_way_edges, ou
                 if edge_id in dict_edges:
                     graph_component.add_edge(dict_edges[edge_id].start, dict_edges[edge_id].end)
                     filtered_edge_ids.add(edge_id)
-            viewer_data, last_idx, sub_complex_component = \
-                split_graph(graph_component, g, undirected_g, dict_edges, modified_dict_edges, loop_edges, edges_by_nodes,
-                            two_way_edges, last_idx, parts_info, contig_edges=filtered_edge_ids)
-            parts_info = viewer_data.parts_info
+            components.append((graph_component, {'contig_edges': filtered_edge_ids}))
+        results = split_components(components, g, undirected_g, dict_edges, modified_dict_edges, loop_edges,
+                                   edges_by_nodes, two_way_edges, parts_info, threads, partitioner=partitioner)
+        for contig, (viewer_data, sub_complex_component) in zip(contig_edges, results):
             for i in range(len(viewer_data.g)):
                 contig_list.append(contig)
             graph.extend(viewer_data.g)
-        with open(join(output_dirpath, 'contig_info.json'), 'w') as handle:
-            handle.write("contigs=" + json.dumps(contig_list) + ";\n")
     elif suffix == "repeat" or suffix == "def":
         fake_edges = []
         if is_flye(assembler):
             ## add fake edges to keep forward and reverse complement components of an edge together
             for edge_id, edge in dict_edges.items():
-                if edge_id.startswith("rc"): continue
+                if is_rc_edge(edge_id): continue
                 if suffix == "repeat" and not edge.repetitive: continue
                 match_edge_id = get_match_edge_id(edge_id)
                 if match_edge_id not in dict_edges: continue
                 match_edge_nodes = [dict_edges[match_edge_id].start, dict_edges[match_edge_id].end]
                 if not any([e in undirected_g.neighbors(edge.start) for e in match_edge_nodes]) and not \
                         any([e in undirected_g.neighbors(edge.end) for e in match_edge_nodes]):
-                    g.add_edge(edge.end, dict_edges[match_edge_id].start)
-                    g.add_edge(edge.start, dict_edges[match_edge_id].end)
-                    fake_edges.append((edge.start, dict_edges[match_edge_id].end))
                     fake_edges.append((edge.end, dict_edges[match_edge_id].start))
-        # split graph into connected components
-        connected_components = list(nx.weakly_connected_component_subgraphs(g))
-        if fake_edges:
-            g.remove_edges_from(fake_edges)
-        for i, graph_component in enumerate(connected_components):
-            viewer_data, last_idx, sub_complex_component = \
-                split_graph(graph_component, base_graph, undirected_g, dict_edges, modified_dict_edges, loop_edges, edges_by_nodes,
-                        two_way_edges, last_idx, parts_info,
-                        fake_edges=fake_edges, find_hanging_nodes=suffix == "def", is_repeat_graph=suffix == "repeat")
-            parts_info = viewer_data.parts_info
+                    fake_edges.append((edge.start, dict_edges[match_edge_id].end))
+        # degrees of nodes in the full graph are used to find hanging nodes and entrances/exits of repeats
+        node_index = get_node_index(base_graph, dict_edges, edges_by_nodes, two_way_edges)
+        # split graph into connected components, fake edges are used only to join components,
+        # components are subgraph views of the graph shared by all viewer modes
+        connected_components = [g.subgraph(nodes) for nodes in get_weakly_connected_components(g, fake_edges)]
+        results = split_components([(graph_component, dict()) for graph_component in connected_components], base_graph,
+                                   undirected_g, dict_edges, modified_dict_edges, loop_edges, edges_by_nodes,
+                                   two_way_edges, parts_info, threads, node_index=node_index,
+                                   find_hanging_nodes=suffix == "def", is_repeat_graph=suffix == "repeat",
+                                   partitioner=partitioner)
+        for viewer_data, sub_complex_component in results:
             graph.extend(viewer_data.g)
             hanging_nodes.extend(viewer_data.hanging_nodes)
             connected_nodes.extend(viewer_data.connected_nodes)
@@ -103,12 +112,125 @@ def process_graph(g, undirected_g, dict_edges, edges_by_nodes, two_way_edges, ou
     edges_by_component = save_graph(graph, hanging_nodes, connected_nodes, enters, exits, dict_edges, modified_dict_edges,
                                     loop_edges, parts_info, output_dirpath, suffix,
                                     complex_component=complex_component,
-                                    mapping_info=mapping_info, chrom_list=chrom_list, contig_list=contig_list)
+                                    mapping_info=mapping_info, chrom_list=chrom_list, contig_list=contig_list,
+                                    layout_cache_dirpath=layout_cache_dirpath, threads=threads)
     return edges_by_component
 
 
+class NodeInfo:
+    # degrees and summed multiplicities of edges of a node in the full graph,
+    # incoming and outgoing edges are stored without loops
+    __slots__ = ('in_degree', 'out_degree', 'in_multiplicity', 'out_multiplicity', 'in_edges', 'out_edges')
+
+    def __init__(self):
+        self.in_degree = 0
+        self.out_degree = 0
+        self.in_multiplicity = 0
+        self.out_multiplicity = 0
+        self.in_edges = []
+        self.out_edges = []
+
+
+def get_node_index(full_g, dict_edges, edges_by_nodes, two_way_edges):
+    node_index = dict()
+    for n in full_g.nodes():
+        node_info = NodeInfo()
+        node_info.in_degree = full_g.in_degree(n)
+        node_info.out_degree = full_g.out_degree(n)
+        for start in full_g.predecessors(n):
+            edges = edges_by_nodes[(start, n)] + two_way_edges[(start, n)]
+            node_info.in_multiplicity += sum(dict_edges[edge_id].multiplicity for edge_id in edges)
+            if start != n:
+                node_info.in_edges.extend(edges)
+        for end in full_g.successors(n):
+            edges = edges_by_nodes[(n, end)] + two_way_edges[(n, end)]
+            node_info.out_multiplicity += sum(dict_edges[edge_id].multiplicity for edge_id in edges)
+            if end != n:
+                node_info.out_edges.extend(edges)
+        node_index[n] = node_info
+    return node_index
+
+
+def split_components(components, full_g, undirected_g, dict_edges, modified_dict_edges, loop_edges, edges_by_nodes,
+                     two_way_edges, parts_info, threads=1, **kwargs):
+    '''
+    Splits each component (a pair of the component graph and its own split_graph options) and returns
+    the list of (viewer_data, complex_component) in the order of components.
+    Big graphs are split by several forked processes, their results are merged in the order of components,
+    so edge copies, loop edges and parts numbering are the same as in one process.
+    '''
+    last_idxs = []
+    last_idx = 0
+    for g_component, options in components:
+        last_idxs.append(last_idx)
+        last_idx += get_num_graph_parts(g_component)
+
+    threads = min(threads, len(components))
+    if threads <= 1 or sum(len(g_component) for g_component, options in components) < PARALLEL_MIN_NODES or \
+            'fork' not in multiprocessing.get_all_start_methods():
+        results = []
+        for (g_component, options), last_idx in zip(components, last_idxs):
+            viewer_data, _, complex_component = \
+                split_graph(g_component, full_g, undirected_g, dict_edges, modified_dict_edges, loop_edges,
+                            edges_by_nodes, two_way_edges, last_idx, parts_info, **dict(kwargs, **options))
+            results.append((viewer_data, complex_component))
+        return results
+
+    global split_jobs
+    split_jobs = (components, last_idxs, full_g, undirected_g, dict_edges, edges_by_nodes, two_way_edges, kwargs)
+    pool = multiprocessing.get_context('fork').Pool(threads)
+    try:
+        worker_results = pool.map(split_component, range(len(components)), chunksize=max(1, len(components) // (threads * 4)))
+    finally:
+        pool.close()
+        pool.join()
+        split_jobs = None
+
+    results = []
+    for viewer_data, complex_component, edge_copies, component_loop_edges in worker_results:
+        for new_edge_id, edge_id, start, end, is_copy in edge_copies:
+            modified_dict_edges[new_edge_id] = dict_edges[edge_id].create_copy(start, end) if is_copy else dict_edges[edge_id]
+        for loop_id, loop_edge_ids in component_loop_edges:
+            for loop_edge_id in loop_edge_ids:
+                add_loop_edge(loop_edges, loop_id, loop_edge_id)
+        parts_info.update(viewer_data.parts_info)
+        viewer_data.parts_info = parts_info
+        viewer_data.modified_dict_edges = modified_dict_edges
+        results.append((viewer_data, complex_component))
+    return results
+
+
+def split_component(component_idx):
+    # worker process: split one component using the graph data inherited from the parent process,
+    # edges are returned by ids and recreated by the parent
+    components, last_idxs, full_g, undirected_g, dict_edges, edges_by_nodes, two_way_edges, kwargs = split_jobs
+    g_component, options = components[component_idx]
+    modified_dict_edges = dict()
+    loop_edges = defaultdict(list)
+    viewer_data, _, complex_component = \
+        split_graph(g_component, full_g, undirected_g, dict_edges, modified_dict_edges, loop_edges, edges_by_nodes,
+                    two_way_edges, last_idxs[component_idx], dict(), **dict(kwargs, **options))
+    edge_copies = [(new_edge_id, edge.id, edge.start, edge.end, isinstance(edge, EdgeView))
+                   for new_edge_id, edge in modified_dict_edges.items()]
+    viewer_data.modified_dict_edges = None
+    return viewer_data, complex_component, edge_copies, list(loop_edges.items())
+
+
+def get_num_graph_parts(g_component):
+    if len(g_component) > MAX_NODES:
+        return int(math.ceil(len(g_component) / MAX_SUB_NODES))
+    return 1
+
+
+def add_loop_edge(loop_edges, loop_id, loop_edge_id):
+    # loop edges are kept in the order of addition
+    if loop_edge_id not in loop_edges[loop_id]:
+        loop_edges[loop_id].append(loop_edge_id)
+
+
 def split_graph(g_component, full_g, undirected_g, dict_edges, modified_dict_edges, loop_edges, edges_by_nodes, two_way_edges, last_idx, parts_info,
-                  is_repeat_graph=False, fake_edges=None, find_hanging_nodes=False, mapping_info=None, chrom=None, contig_edges=None):
+                  is_repeat_graph=False, find_hanging_nodes=False, mapping_info=None, chrom=None, contig_edges=None,
+                  partitioner=None, node_index=None):
     graphs = []
     hanging_nodes = []
     connected_nodes = []
@@ -118,10 +240,11 @@ def split_graph(g_component, full_g, undirected_g, dict_edges, modified_dict_edg
     complex_component = False
     if len(g_component) > MAX_NODES:
         complex_component = True
-        target_graph_parts = int(math.ceil(len(g_component.nodes()) / MAX_SUB_NODES))
-        # use METIS library to partition a graph into smaller subgraphs
-        options = nxmetis.MetisOptions(ncuts=5, niter=100, ufactor=2, objtype=1, contig=not mapping_info, minconn=True)
-        edgecuts, parts = nxmetis.partition(g_component.to_undirected(), target_graph_parts, options=options)
+        target_graph_parts = get_num_graph_parts(g_component)
+        # partition a graph into smaller subgraphs (METIS library is used by default)
+        parts = partition_graph(g_component.to_undirected(), target_graph_parts, partitioner, contiguous=not mapping_info)
+        # parts numbering of the following components depends only on the requested number of parts
+        parts = list(parts) + [[] for _ in range(target_graph_parts - len(parts))]
         graph_partition_dict = dict()
         for part_id, nodes in enumerate(parts):
             for node in nodes:
@@ -149,8 +272,29 @@ def split_graph(g_component, full_g, undirected_g, dict_edges, modified_dict_edg
             return edge_id not in contig_edges
         return False
 
-    if fake_edges:
-        g_component.remove_edges_from(fake_edges)
+    flanking_edges_by_node = dict()
+
+    def get_flanking_edges(node):
+        # flanking edges adjacent to the node grouped by node pairs, computed once for each node
+        if node not in flanking_edges_by_node:
+            neighbors = list(undirected_g.neighbors(node))
+            node_flanking_edges = []
+            for pair in [(node, n) for n in neighbors] + [(n, node) for n in neighbors]:
+                edge_ids = [edge_id for edge_id in edges_by_nodes[pair] + two_way_edges[pair] if is_flanking_edge(edge_id)]
+                if edge_ids:
+                    node_flanking_edges.append((pair, edge_ids))
+            flanking_edges_by_node[node] = node_flanking_edges
+        return flanking_edges_by_node[node]
+
+    # bucket edges and nodes by subgraphs, an edge between two subgraphs belongs to both of them
+    part_edges = [[] for _ in range(num_graph_parts)]
+    for start, end in g_component.edges():
+        part_edges[graph_partition_dict[start]].append((start, end))
+        if graph_partition_dict[end] != graph_partition_dict[start]:
+            part_edges[graph_partition_dict[end]].append((start, end))
+    part_nodes = [[] for _ in range(num_graph_parts)]
+    for n in g_component.nodes():
+        part_nodes[graph_partition_dict[n]].append(n)
     # iterate through subgraphs of the component
     for part_id in range(num_graph_parts):
         subgraph = []
@@ -161,22 +305,14 @@ def split_graph(g_component, full_g, undirected_g, dict_edges, modified_dict_edg
         flanking_edges = defaultdict(set)
         total_exits = 0
         total_enters = 0
-        for e in g_component.edges():
-            start, end = e[0], e[1]
-            if part_id == graph_partition_dict[start] or part_id == graph_partition_dict[end]:
-                # use edges that belongs to the current subgraph
-                edges = edges_by_nodes[(start, end)] + two_way_edges[(start, end)]
-                for edge_id in edges:
-                    if not is_flanking_edge(edge_id):
-                        main_edges[(start, end)].add(edge_id)
-                flanking_edge_pairs = [(start, node) for node in undirected_g.neighbors(start)] + \
-                                      [(node, start) for node in undirected_g.neighbors(start)] + \
-                                      [(end, node) for node in undirected_g.neighbors(end)] + \
-                                      [(node, end) for node in undirected_g.neighbors(end)]
-                for start, end in flanking_edge_pairs:
-                    for edge_id in edges_by_nodes[(start, end)] + two_way_edges[(start, end)]:
-                        if is_flanking_edge(edge_id):
-                            flanking_edges[(start, end)].add(edge_id)
+        for start, end in part_edges[part_id]:
+            # use edges that belongs to the current subgraph
+            edges = edges_by_nodes[(start, end)] + two_way_edges[(start, end)]
+            for edge_id in edges:
+                if not is_flanking_edge(edge_id):
+                    main_edges[(start, end)].add(edge_id)
+            for pair, edge_ids in get_flanking_edges(start) + get_flanking_edges(end):
+                flanking_edges[pair].update(edge_ids)
 
         unique_nodes = set()
         for graph_edges, is_flanking in [(main_edges, False), (flanking_edges, True)]:
@@ -196,9 +332,9 @@ def split_graph(g_component, full_g, undirected_g, dict_edges, modified_dict_edg
                     # add edges to a hidden part of the graph
                     for edge_id in edges:
                         edge = dict_edges[edge_id]
-                        new_edge_id = edge.id
+                        new_edge_id = format_edge_id(edge.id)
                         if edges_count[edge.id]:
-                            new_edge_id = edge.id + '_' + str(edges_count[edge.id])
+                            new_edge_id += '_' + str(edges_count[edge.id])
                         edges_count[edge.id] += 1
                         if start == 'part' + str(link_component):
                             parts_info['part' + str(link_component)]['out'].add(new_edge_id)
@@ -210,9 +346,9 @@ def split_graph(g_component, full_g, undirected_g, dict_edges, modified_dict_edg
                 elif start != end or len(edges) < 2:
                     for edge_id in edges:
                         edge = dict_edges[edge_id]
-                        new_edge_id = edge.id
+                        new_edge_id = format_edge_id(edge.id)
                         if edges_count[edge.id]:  # edges with the same id can belongs to several graph components
-                            new_edge_id = edge.id + '_' + str(edges_count[edge.id])
+                            new_edge_id += '_' + str(edges_count[edge.id])
                         edges_count[edge.id] += 1
                         new_edge = edge.create_copy(start, end)
                         modified_dict_edges[new_edge_id] = new_edge
@@ -225,73 +361,44 @@ def split_graph(g_component, full_g, undirected_g, dict_edges, modified_dict_edg
                     subgraph.append(edge_id)
                     for loop_edge_id in edges:
                         edge = dict_edges[loop_edge_id]
-                        modified_dict_edges[loop_edge_id] = edge
-                        loop_edges[edge_id].add(loop_edge_id)
+                        modified_dict_edges[format_edge_id(loop_edge_id)] = edge.create_copy(edge.start, edge.end)
+                        add_loop_edge(loop_edges, edge_id, loop_edge_id)
 
         graphs.append((len(subgraph) + 10000 * (num_graph_parts - part_id), subgraph))  # add unique subgraph id
         if find_hanging_nodes:
             # search for nodes with zero indegree or outdegree
-            for n in g_component.nodes():
-                if graph_partition_dict[n] != part_id:
-                    continue
-                in_multiplicity = 0
-                out_multiplicity = 0
-                for e in full_g.in_edges(n):
-                    edges = edges_by_nodes[(e[0], e[1])] + two_way_edges[(e[0], e[1])]
-                    for edge_id in edges:
-                        in_multiplicity += dict_edges[edge_id].multiplicity
-                for e in full_g.out_edges(n):
-                    edges = edges_by_nodes[(e[0], e[1])] + two_way_edges[(e[0], e[1])]
-                    for edge_id in edges:
-                        out_multiplicity += dict_edges[edge_id].multiplicity
-                if not full_g.in_degree(n) or not full_g.out_degree(n):
+            for n in part_nodes[part_id]:
+                node_info = node_index[n]
+                if not node_info.in_degree or not node_info.out_degree:
                     sub_hanging_nodes.append(n)
-                elif int(out_multiplicity - in_multiplicity) != 0:
+                elif int(node_info.out_multiplicity - node_info.in_multiplicity) != 0:
                     subnodes.append(n)
             hanging_nodes.append(sub_hanging_nodes)
         if is_repeat_graph:
             # search for nodes with zero indegree or outdegree
-            for n in g_component.nodes():
-                if graph_partition_dict[n] != part_id:
-                    continue
-                if not full_g.in_degree(n) or not full_g.out_degree(n):
+            for n in part_nodes[part_id]:
+                if not node_index[n].in_degree or not node_index[n].out_degree:
                     sub_hanging_nodes.append(n)
             for n in unique_nodes:
-                if not full_g.in_degree(n) or not full_g.out_degree(n):
+                if not node_index[n].in_degree or not node_index[n].out_degree:
                     sub_hanging_nodes.append(n)
             # add flanking unique edges and calculate number of entrances/exits to the repeat cluster
+            subgraph_edges = set(subgraph)
             for n in unique_nodes:
                 enters = 0
                 exits = 0
                 other_edges = 0
-                for e in full_g.in_edges(n):
-                    start, end = e[0], e[1]
-                    edges = edges_by_nodes[(start, end)] + two_way_edges[(start, end)]
-                    for edge_id in edges:
-                        if start == end:
-                            continue
-                        if edge_id in subgraph and dict_edges[edge_id].repetitive:
+                for edge_ids, is_in_edge in [(node_index[n].in_edges, True), (node_index[n].out_edges, False)]:
+                    for edge_id in edge_ids:
+                        in_subgraph = format_edge_id(edge_id) in subgraph_edges
+                        if in_subgraph and dict_edges[edge_id].repetitive:
                             continue
-                        if edge_id in subgraph:
-                            if start != end:
-                                exits += 1
+                        if not in_subgraph:
+                            other_edges += 1
+                        elif is_in_edge:
+                            exits += 1
                         else:
-                            if start != end or n not in g_component.nodes():
-                                other_edges += 1
-                for e in full_g.out_edges(n):
-                    start, end = e[0], e[1]
-                    edges = edges_by_nodes[(start, end)] + two_way_edges[(start, end)]
-                    for edge_id in edges:
-                        if start == end:
-                            continue
-                        if edge_id in subgraph and dict_edges[edge_id].repetitive:
-                            continue
-                        if edge_id in subgraph:
-                            if start != end:
-                                enters += 1
-                        else:
-                            if start != end or n not in g_component.nodes():
-                                other_edges += 1
+                            enters += 1
                 if other_edges:
                     sub_connected_nodes.append(n)
                     total_exits += exits
@@ -308,7 +415,8 @@ def split_graph(g_component, full_g, undirected_g, dict_edges, modified_dict_edg
 
 def save_graph(graph, hanging_nodes, connected_nodes, enters, exits, dict_edges, modified_dict_edges,
                loop_edges, parts_info, output_dirpath, suffix,
-               mapping_info=None, complex_component=False, chrom_list=None, contig_list=None):
+               mapping_info=None, complex_component=False, chrom_list=None, contig_list=None,
+               layout_cache_dirpath=None, threads=1):
     if not complex_component:
         if connected_nodes:
             sorted_graph = sorted(zip(graph, hanging_nodes, connected_nodes, enters, exits), key=lambda pair: pair[0], reverse=True)
@@ -318,24 +426,34 @@ def save_graph(graph, hanging_nodes, connected_nodes, enters, exits, dict_edges,
             graph, hanging_nodes = zip(*sorted_graph)
 
     edges_by_component = dict()
-    # create JSON with DOT for each graph component
+    # the component of each edge in this mode is used by the viewer to find the component with the edge
+    component_by_edge = dict()
+    component_dots = []
+    component_edge_ids = []
+    layout_dots = []
+    # create JSON with the index of graph components, DOT and edges of each component are saved to a separate file
     with open(join(output_dirpath, suffix + '_graph.json'), 'w') as out_f:
         out_f.write(suffix + '_graphs=[')
         for i, (n, subgraph) in enumerate(graph):
-            additional_info = ""
+            component_info = {'n': len(subgraph)}
             if chrom_list:
-                additional_info = 'chrom: "%s", ' % chrom_list[i]
+                component_info['chrom'] = chrom_list[i]
             elif contig_list:
-                additional_info = 'contig: "%s", ' % contig_list[i]
+                component_info['contig'] = contig_list[i]
             if enters or exits:
-                additional_info = 'enters: %d, exits: %d, ' % (enters[i], exits[i])
-            out_f.write('{n:%d, ' % len(subgraph) + additional_info + 'dot:')
-            out_f.write('`')
-            print_dot_header(out_f)
+                component_info['enters'], component_info['exits'] = enters[i], exits[i]
+            dot_f = io.StringIO()
+            print_dot_header(dot_f)
             chrom = chrom_list[i] if chrom_list else None
+            # ids of the component edges are listed in the index to build the table of components in the viewer
+            index_edges = []
+            edge_ids = set()
+            layout_edges = []
             for edge_id in set(subgraph):
                 edge = modified_dict_edges[edge_id] if edge_id in modified_dict_edges else None
                 real_id = edge.id if edge else edge_id
+                if edge:
+                    edge_ids.add(edge_id)
                 if real_id in dict_edges:
                     if not mapping_info or (mapping_info[real_id] and chrom in mapping_info[real_id]):
                         if suffix == "def":
@@ -344,6 +462,7 @@ def save_graph(graph, hanging_nodes, connected_nodes, enters, exits, dict_edges,
                             modified_dict_edges[edge_id].repeat_component = i
                         elif suffix == "ref":
                             modified_dict_edges[edge_id].ref_component = i
+                        component_by_edge[edge_id] = i
                     edges_by_component[real_id] = i
                 else:
                     edge = Edge(real_id)
@@ -352,40 +471,67 @@ def save_graph(graph, hanging_nodes, connected_nodes, enters, exits, dict_edges,
                     for loop_e in loop_edges[real_id]:
                         real_id = dict_edges[loop_e].id if loop_e in dict_edges else loop_e
                         if not mapping_info or (mapping_info[real_id] and chrom in mapping_info[real_id]):
+                            loop_edge_id = format_edge_id(loop_e)
+                            loop_edge = modified_dict_edges[loop_edge_id]
                             if suffix == "def":
-                                modified_dict_edges[loop_e].component = i
+                                loop_edge.component = i
                             elif suffix == "repeat":
-                                modified_dict_edges[loop_e].repeat_component = i
+                                loop_edge.repeat_component = i
                             elif suffix == "ref":
-                                modified_dict_edges[loop_e].ref_component = i
-                            modified_dict_edges[loop_e].element_id = edge_id
+                                loop_edge.ref_component = i
+                            loop_edge.element_id = edge_id
+                            edge_ids.add(loop_edge_id)
+                            component_by_edge[loop_edge_id] = i
                             edges_by_component[loop_e] = i
                             edges_by_component[real_id] = i
-                            edge.start, edge.end = modified_dict_edges[loop_e].start, modified_dict_edges[loop_e].start
-                            colors.add(modified_dict_edges[loop_e].color)
+                            edge.start, edge.end = loop_edge.start, loop_edge.start
+                            colors.add(loop_edge.color)
                     if len(colors) == 1:
                         edge.color = colors.pop()
                 if edge.start is not None:
-                    out_f.write(edge.print_edge_to_dot(id=edge_id))
-            out_f.write('}`},')
+                    dot_f.write(edge.print_edge_to_dot(id=edge_id))
+                    index_edges.append(edge_id)
+                    if layout_cache_dirpath:
+                        layout_edges.append(format_layout_edge(edge, edge_id))
+            dot_f.write('}')
+            component_info['edges'] = index_edges
+            out_f.write(json.dumps(component_info) + ',')
+            component_dots.append(dot_f.getvalue())
+            component_edge_ids.append(edge_ids)
+            if layout_cache_dirpath:
+                layout_dots.append(get_layout_dot(layout_edges))
         out_f.write('];')
+        if suffix == "ref":
+            out_f.write("\nchromosomes=" + json.dumps(chrom_list or []) + ";")
+        elif suffix == "contig":
+            out_f.write("\ncontigs=" + json.dumps(contig_list or []) + ";")
+
+    # positions of nodes and edges computed by Graphviz are used by the viewer instead of the layout in the browser
+    layouts = compute_layouts(layout_dots, layout_cache_dirpath, threads) if layout_cache_dirpath else []
 
     for e, loops in loop_edges.items():
-        loop_edges[e] = list(loops)
+        loop_edges[e] = [format_edge_id(loop_e) for loop_e in loops]
 
     for part_id in parts_info:
-        parts_info[part_id]['in'] = list(parts_info[part_id]['in'])
-        parts_info[part_id]['out'] = list(parts_info[part_id]['out'])
+        # sorted to keep the output independent of the order of set elements
+        parts_info[part_id]['in'] = sorted(parts_info[part_id]['in'])
+        parts_info[part_id]['out'] = sorted(parts_info[part_id]['out'])
 
     # save additional data to JSON files
     with open(join(output_dirpath, suffix + '_partition_info.json'), 'w') as handle:
         handle.write(suffix + "PartitionDict=" + json.dumps(parts_info) + ";")
 
+    edge_summary = dict((edge_id, edge.as_summary(component_by_edge.get(edge_id)))
+                        for edge_id, edge in modified_dict_edges.items())
     with open(join(output_dirpath, suffix + '_edges_data.json'), 'w') as handle:
-        json_dict_edges = dict((edge_id, edge.as_dict()) for edge_id, edge in modified_dict_edges.items())
-        handle.write(suffix + "EdgeData=" + json.dumps(json_dict_edges) + ";\n")
+        # edge records are added by the files of graph components when they are loaded,
+        # the summary of all edges is used by the tables, the search and the length/coverage filters
+        handle.write(suffix + "EdgeData={};\n")
+        handle.write(suffix + "EdgeSummary=" + json.dumps(edge_summary) + ";\n")
         handle.write(suffix + "LoopEdgeDict=" + json.dumps(loop_edges) + ";\n")
 
+    save_component_files(output_dirpath, suffix, component_dots, layouts, component_edge_ids, modified_dict_edges)
+
     if suffix == "def" or suffix=="repeat":
         with open(join(output_dirpath, suffix + '_node_info.json'), 'w') as handle:
             handle.write(suffix + "LeafNodes=" + json.dumps(hanging_nodes) + ";")
@@ -394,3 +540,17 @@ def save_graph(graph, hanging_nodes, connected_nodes, enters, exits, dict_edges,
         with open(join(output_dirpath, suffix + '_node_info.json'), 'a') as handle:
             handle.write(suffix + "ConnectNodes=" + json.dumps(connected_nodes) + ";")
     return edges_by_component
+
+
+def save_component_files(output_dirpath, suffix, component_dots, layouts, component_edge_ids, modified_dict_edges):
+    # the viewer loads the file of a graph component only when the component is shown
+    components_dirpath = join(output_dirpath, suffix + '_components')
+    if exists(components_dirpath):
+        shutil.rmtree(components_dirpath)
+    os.makedirs(components_dirpath)
+    for i, dot in enumerate(component_dots):
+        component_data = {'layout': layouts[i] if layouts else None,
+                          'edges': dict((edge_id, modified_dict_edges[edge_id].as_dict())
+                                        for edge_id in sorted(component_edge_ids[i]))}
+        with open(join(components_dirpath, '%d.json' % i), 'w') as handle:
+            handle.write('componentLoaded("%s", %d, `%s`, %s);' % (suffix, i, dot, json.dumps(component_data)))
@@ -0,0 +1,73 @@
+import hashlib
+import os
+import pickle
+from os.path import join, exists, abspath, getsize, isfile
+
+from agb_src.scripts.utils import get_dir_manifest, get_file_stat
+
+GRAPH_CACHE_VERSION = 5  # increase when the format of the parsed graph changes
+GRAPH_CACHE_FNAME = "assembly_graph.cache"
+
+
+def get_file_identity(fpath):
+    stat = os.stat(fpath)
+    return abspath(fpath), stat.st_size, stat.st_mtime_ns
+
+
+def get_graph_cache_key(assembler, input_dirpath, input_fpath, input_fasta_fpath, min_edge_len, extract_seqs=False):
+    # the key depends on the input paths and on the parsing options,
+    # files of the assembler output folder are checked by get_used_input_files when the cache is loaded
+    key_data = [GRAPH_CACHE_VERSION, (assembler or '').lower(), min_edge_len, extract_seqs]
+    for fpath in [input_fpath, input_fasta_fpath]:
+        if fpath and isfile(fpath):
+            key_data.append(get_file_identity(fpath))
+    if input_dirpath:
+        key_data.append(abspath(input_dirpath))
+    return hashlib.sha1(repr(key_data).encode()).hexdigest()
+
+
+def get_used_input_files(input_dirpath):
+    # files found by the parsers in the assembler output folder with their sizes and modification times
+    if not input_dirpath:
+        return []
+    found_files = get_dir_manifest(input_dirpath).found_files
+    return [(key, get_file_stat(fpath) if fpath else None) for key, fpath in sorted(found_files.items())]
+
+
+def is_input_actual(input_dirpath, used_files):
+    # the same files should be found by the same lookups, and they should not be changed
+    if not input_dirpath:
+        return True
+    manifest = get_dir_manifest(input_dirpath)
+    for key, file_stat in used_files:
+        fpath = manifest.lookup(key)
+        if (file_stat is None) != (fpath is None) or (fpath and get_file_stat(fpath) != tuple(file_stat)):
+            return False
+    return True
+
+
+def load_graph_cache(output_dirpath, cache_key, input_dirpath=None):
+    cache_fpath = join(output_dirpath, GRAPH_CACHE_FNAME)
+    if not exists(cache_fpath) or not getsize(cache_fpath):
+        return None
+    try:
+        with open(cache_fpath, 'rb') as f:
+            version, key, used_files = pickle.load(f)
+            if version != GRAPH_CACHE_VERSION or key != cache_key or not is_input_actual(input_dirpath, used_files):
+                return None
+            dict_edges, contig_edges, edges_fpath = pickle.load(f)
+    except Exception:
+        return None
+    if edges_fpath and not exists(edges_fpath):
+        return None
+    return dict_edges, contig_edges, edges_fpath
+
+
+def save_graph_cache(output_dirpath, cache_key, dict_edges, contig_edges, edges_fpath, input_dirpath=None):
+    cache_fpath = join(output_dirpath, GRAPH_CACHE_FNAME)
+    tmp_fpath = cache_fpath + ".tmp"
+    with open(tmp_fpath, 'wb') as f:
+        pickle.dump((GRAPH_CACHE_VERSION, cache_key, get_used_input_files(input_dirpath)), f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump((dict_edges, contig_edges, edges_fpath), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_fpath, cache_fpath)
@@ -0,0 +1,63 @@
+from collections import defaultdict
+from itertools import chain
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+except ImportError:
+    csr_matrix = None
+
+
+def get_weakly_connected_components(g, extra_edges=None):
+    '''
+    Returns the list of node lists of weakly connected components of the directed graph,
+    components are ordered by their first node in the graph.
+    Extra edges join components without being added to the graph, edges with nodes out of the graph are ignored.
+    Components are found on the sparse adjacency matrix if SciPy is installed.
+    '''
+    extra_edges = [(start, end) for start, end in extra_edges or [] if start in g and end in g]
+    if csr_matrix is not None:
+        return find_components_sparse(g, extra_edges)
+    return find_components_bfs(g, extra_edges)
+
+
+def find_components_sparse(g, extra_edges):
+    nodes = list(g)
+    node_idx = dict((node, i) for i, node in enumerate(nodes))
+    num_edges = g.number_of_edges() + len(extra_edges)
+    starts = np.fromiter((node_idx[start] for start, end in chain(g.edges(), extra_edges)), dtype=np.int64, count=num_edges)
+    ends = np.fromiter((node_idx[end] for start, end in chain(g.edges(), extra_edges)), dtype=np.int64, count=num_edges)
+    adjacency = csr_matrix((np.ones(num_edges, dtype=np.int8), (starts, ends)), shape=(len(nodes), len(nodes)))
+    num_components, labels = connected_components(adjacency, directed=True, connection='weak')
+    # labels are assigned in the order of nodes, so components are ordered by their first node
+    components = [[] for _ in range(num_components)]
+    for node, label in zip(nodes, labels.tolist()):
+        components[label].append(node)
+    return components
+
+
+def find_components_bfs(g, extra_edges):
+    extra_neighbors = defaultdict(list)
+    for start, end in extra_edges:
+        extra_neighbors[start].append(end)
+        extra_neighbors[end].append(start)
+    labels = dict()
+    num_components = 0
+    for node in g:
+        if node in labels:
+            continue
+        labels[node] = num_components
+        queue = [node]
+        while queue:
+            n = queue.pop()
+            for neighbor in chain(g.successors(n), g.predecessors(n), extra_neighbors[n]):
+                if neighbor not in labels:
+                    labels[neighbor] = num_components
+                    queue.append(neighbor)
+        num_components += 1
+    # nodes are kept in the order of the graph as in the sparse search
+    components = [[] for _ in range(num_components)]
+    for node in g:
+        components[labels[node]].append(node)
+    return components
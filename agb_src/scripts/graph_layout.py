@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import subprocess
+from multiprocessing.pool import ThreadPool
+from os.path import join, exists
+
+from agb_src.scripts.utils import get_path_to_program
+
+LAYOUT_CACHE_DIRNAME = "layout_cache"
+LAYOUT_TIMEOUT = 600  # seconds for one graph component
+
+# graph and node attributes are the same as in the DOT built by the viewer
+LAYOUT_DOT_HEADER = 'digraph {\ngraph [pad="0.5", ranksep=1,nodesep=0.5];\nnode [shape = circle, label = "", height = 0.15];\n'
+
+
+def format_layout_edge(edge, edge_id):
+    if edge.is_complex_loop:
+        label = ""
+    else:
+        label = 'id %s\\l%sk %dx' % (edge.name, edge.format_len(), edge.cov)
+    return '"%s" -> "%s" [label="%s",id = "%s"];\n' % (edge.start, edge.end, label, edge_id)
+
+
+def get_layout_dot(layout_edges):
+    # edges are sorted to get the same DOT (and the same cached layout) for the same component
+    return LAYOUT_DOT_HEADER + ''.join(sorted(layout_edges)) + '}\n'
+
+
+def get_layout_key(dot_src):
+    return hashlib.sha1(dot_src.encode()).hexdigest()
+
+
+def run_dot(dot_src):
+    '''
+    Returns positions of nodes and edges computed by Graphviz dot or None if the layout failed:
+    {'nodes': {node: "x,y"}, 'edges': {edge_id: [start, end, spline, label_pos]}}
+    '''
+    dot_exec_path = get_path_to_program("dot")
+    if not dot_exec_path:
+        return None
+    try:
+        result = subprocess.run([dot_exec_path, "-Tjson0"], input=dot_src.encode(), stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, timeout=LAYOUT_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    try:
+        graph_json = json.loads(result.stdout.decode())
+    except ValueError:
+        return None
+    nodes = graph_json.get('objects', [])
+    node_positions = dict((node['name'], node['pos']) for node in nodes if 'pos' in node)
+    edge_positions = dict()
+    for edge in graph_json.get('edges', []):
+        if 'id' in edge and 'pos' in edge:
+            edge_positions[edge['id']] = [nodes[edge['tail']]['name'], nodes[edge['head']]['name'], edge['pos'],
+                                          edge.get('lp')]
+    return {'nodes': node_positions, 'edges': edge_positions}
+
+
+def compute_layouts(dot_sources, cache_dirpath, threads=1):
+    # layouts are stored in the cache folder by the hash of the DOT, so unchanged components are not laid out again
+    if not exists(cache_dirpath):
+        os.makedirs(cache_dirpath, exist_ok=True)
+    keys = [get_layout_key(dot_src) for dot_src in dot_sources]
+    layouts = [load_layout(cache_dirpath, key) for key in keys]
+    missing_idxs = [i for i, layout in enumerate(layouts) if layout is None]
+    if missing_idxs:
+        # dot runs in separate processes, so threads only wait for them
+        pool = ThreadPool(max(1, min(threads, len(missing_idxs))))
+        try:
+            new_layouts = pool.map(run_dot, [dot_sources[i] for i in missing_idxs])
+        finally:
+            pool.close()
+            pool.join()
+        for i, layout in zip(missing_idxs, new_layouts):
+            if layout is not None:
+                save_layout(cache_dirpath, keys[i], layout)
+            layouts[i] = layout
+    return layouts
+
+
+def load_layout(cache_dirpath, key):
+    layout_fpath = join(cache_dirpath, key + ".json")
+    if not exists(layout_fpath):
+        return None
+    try:
+        with open(layout_fpath) as f:
+            return json.load(f)
+    except ValueError:
+        return None
+
+
+def save_layout(cache_dirpath, key, layout):
+    # viewer modes can be built concurrently, so the file is replaced at once
+    layout_fpath = join(cache_dirpath, key + ".json")
+    tmp_fpath = layout_fpath + ".tmp" + str(os.getpid())
+    with open(tmp_fpath, 'w') as f:
+        json.dump(layout, f)
+    os.replace(tmp_fpath, layout_fpath)
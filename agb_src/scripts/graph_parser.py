@@ -1,101 +1,115 @@
+import itertools
 import re
-import sys
-import subprocess
-from os.path import basename
 from collections import defaultdict
 
 import gfapy
-import networkx as nx
 
 from agb_src.scripts.config import *
-from agb_src.scripts.edge import Edge
-from agb_src.scripts.utils import get_edge_agv_id, calculate_median_cov, get_edge_num, find_file_by_pattern, \
-    is_empty_file, can_reuse, is_osx, is_abyss, is_spades, is_velvet, is_soap, is_sga, get_match_edge_id, \
-    edge_id_to_name, get_filename, is_acgt_seq
+from agb_src.scripts.dot_reader import iter_dot_statements, get_dot_dialect
+from agb_src.scripts.edge import Edge, EdgeDict
+from agb_src.scripts.gfa_reader import iter_gfa_records, read_gfa, EdgeSeqWriter, CHUNK_SIZE
+from agb_src.scripts.utils import get_edge_agv_id, get_edge_id, calculate_median_cov, get_edge_num, find_file_by_pattern, \
+    is_empty_file, can_reuse, is_abyss, is_spades, get_match_edge_id, is_rc_edge, format_edge_id, \
+    edge_id_to_name, get_filename, get_input_fpath, DisjointSet, open_file
+
+abyss_id_pattern = re.compile(r'(\d+)([+-])$')
+flye_label_pattern = re.compile(r'id (?P<edge_id>\-*.+) (?P<edge_len>[0-9\.]+)k (?P<coverage>\d+)')
+fastg_name_pattern = re.compile(r"(?:EDGE|NODE)_(?P<edge_num>\d+)(?:_length_(?P<length>\d+))?(?:_cov_(?P<cov>\d+\.?\d*))?")
 
 repeat_colors = ["red", "darkgreen", "blue", "goldenrod", "cadetblue1", "darkorchid", "aquamarine1",
                  "darkgoldenrod1", "deepskyblue1", "darkolivegreen3"]
 
 
+def parse_dot(dot_fpath, min_edge_len, assembler=None):
+    ## the format of the file is detected by the first statements, the file is read only once
+    with open_file(dot_fpath) as f:
+        statements = iter_dot_statements(f)
+        first_statements = []
+        dialect = None
+        for statement in statements:
+            first_statements.append(statement)
+            dialect = get_dot_dialect(*statement)
+            if dialect:
+                break
+        statements = itertools.chain(first_statements, statements)
+        if dialect == ABYSS_NAME or (not dialect and is_abyss(assembler)):
+            return parse_abyss_dot_statements(statements, min_edge_len)
+        return parse_flye_dot_statements(statements, min_edge_len)
+
+
 def parse_abyss_dot(dot_fpath, min_edge_len):
+    with open_file(dot_fpath) as f:
+        return parse_abyss_dot_statements(iter_dot_statements(f), min_edge_len)
+
+
+def parse_abyss_dot_statements(statements, min_edge_len):
     '''digraph adj {
     graph [k=50]
     edge [d=-49]
     "3+" [l=99 C=454]
     "3-" [l=99 C=454]
     '''
-    dict_edges = dict()
-    predecessors = defaultdict(list)
-    successors = defaultdict(list)
-
-    edge_pattern = '"?(?P<edge_id>\d+)(?P<edge_sign>[\+\-])"? (?P<info>.+)'
-    link_pattern = '"?(?P<start>\d+)(?P<start_sign>[\+\-])"? -> "?(?P<end>\d+)(?P<end_sign>[\+\-])"?'
-    info_pattern = 'l=(?P<edge_len>\d+) C=(?P<edge_cov>\d+)'
-    with open(dot_fpath) as f:
-        for line in f:
-            if 'l=' in line:
-                #  "3+" -> "157446-" [d=-45]
-                match = re.search(edge_pattern, line)
-                if not match or len(match.groups()) < 3:
-                    continue
-                edge_id, edge_sign, info = match.group('edge_id'), match.group('edge_sign'), match.group('info')
-                edge_name = (edge_sign if edge_sign != '+' else '') + edge_id
-                edge_id = get_edge_agv_id(edge_name)
-                match = re.search(info_pattern, info)
-                if match and len(match.groups()) == 2:
-                    cov = max(1, int(match.group('edge_cov')))
-                    edge_len = max(1, int(float(match.group('edge_len'))))
-                    if edge_len >= min_edge_len:
-                        edge = Edge(edge_id, edge_name, edge_len, cov, element_id=edge_id)
-                        dict_edges[edge_id] = edge
-            if '->' in line:
-                #  "3+" -> "157446-" [d=-45]
-                match = re.search(link_pattern, line)
-                if not match or len(match.groups()) < 2:
-                    continue
-                start, start_sign, end, end_sign = match.group('start'), match.group('start_sign'), match.group('end'), match.group('end_sign')
-                start_edge_id = get_edge_agv_id((start_sign if start_sign == '-' else '') + start)
-                end_edge_id = get_edge_agv_id((end_sign if end_sign == '-' else '') + end)
-                predecessors[end_edge_id].append(start_edge_id)
-                successors[start_edge_id].append(end_edge_id)
+    dict_edges = EdgeDict()
+    links = []
+
+    for statement_type, ids, attrs in statements:
+        if statement_type == 'node':
+            #  "3+" [l=99 C=454]
+            match = abyss_id_pattern.match(ids[0])
+            if not match or 'l' not in attrs or 'C' not in attrs:
+                continue
+            edge_num, edge_sign = match.groups()
+            edge_name = (edge_sign if edge_sign != '+' else '') + edge_num
+            edge_id = get_edge_id(int(edge_num)) | (edge_sign == '-')
+            cov = max(1, int(attrs['C']))
+            edge_len = max(1, int(float(attrs['l'])))
+            if edge_len >= min_edge_len:
+                edge = Edge(edge_id, edge_name, edge_len, cov)
+                dict_edges[edge_id] = edge
+        elif statement_type == 'edge':
+            #  "3+" -> "157446-" [d=-45]
+            start_match, end_match = abyss_id_pattern.match(ids[0]), abyss_id_pattern.match(ids[1])
+            if not start_match or not end_match:
+                continue
+            (start, start_sign), (end, end_sign) = start_match.groups(), end_match.groups()
+            start_edge_id = get_edge_id(int(start)) | (start_sign == '-')
+            end_edge_id = get_edge_id(int(end)) | (end_sign == '-')
+            links.append((start_edge_id, end_edge_id))
 
-    dict_edges = construct_graph(dict_edges, predecessors, successors)
+    dict_edges = construct_graph(dict_edges, links)
     return dict_edges
 
 
 def parse_flye_dot(dot_fpath, min_edge_len):
-    dict_edges = dict()
-
-    pattern = '"?(?P<start>\d+)"? -> "?(?P<end>\d+)"? \[(?P<info>.+)]'
-    label_pattern = 'id (?P<edge_id>\-*.+) (?P<edge_len>[0-9\.]+)k (?P<coverage>\d+)'
-    with open(dot_fpath) as f:
-        for line in f:
-            if 'label =' in line:
-                # "7" -> "29" [label = "id 1\l53k 59x", color = "black"] ;
-                line = line.replace('\\l', ' ')
-                match = re.search(pattern, line)
-                if not match or len(match.groups()) < 3:
-                    continue
-                start, end, info = match.group('start'), match.group('end'), match.group('info')
-                params_dict = dict(param.split(' = ') for param in info.split(', ') if '=' in param)
-                # label = params_dict.get('label')
-                color = params_dict.get('color').strip().replace('"', '')
-                line = line.replace(' ,', ',')
-                match = re.search(label_pattern, info)
-                if match and match.group('edge_id'):
-                    edge_id = get_edge_agv_id(match.group('edge_id'))
-                    cov = max(1, int(match.group('coverage')))
-                    edge_len = max(1, int(float(match.group('edge_len')) * 1000))
-                    if edge_len < min_edge_len:
-                        continue
-                    edge = Edge(edge_id, match.group('edge_id'), edge_len, cov, element_id=edge_id)
-                    edge.color = color
-                    if edge.color != "black":
-                        edge.repetitive = True
-                    edge.start, edge.end = int(start), int(end)
-                    if 'dir = both' in line:
-                        edge.two_way = True
-                    dict_edges[edge_id] = edge
+    with open_file(dot_fpath) as f:
+        return parse_flye_dot_statements(iter_dot_statements(f), min_edge_len)
+
+
+def parse_flye_dot_statements(statements, min_edge_len):
+    dict_edges = EdgeDict()
+
+    for statement_type, ids, attrs in statements:
+        # "7" -> "29" [label = "id 1\l53k 59x", color = "black"] ;
+        if statement_type != 'edge' or 'label' not in attrs:
+            continue
+        start, end = ids
+        if not start.isdigit() or not end.isdigit():
+            continue
+        match = flye_label_pattern.search(attrs['label'].replace('\\l', ' '))
+        if match and match.group('edge_id'):
+            edge_id = get_edge_id(match.group('edge_id'))
+            cov = max(1, int(match.group('coverage')))
+            edge_len = max(1, int(float(match.group('edge_len')) * 1000))
+            if edge_len < min_edge_len:
+                continue
+            edge = Edge(edge_id, match.group('edge_id'), edge_len, cov)
+            edge.color = attrs.get('color', '').strip()
+            if edge.color != "black":
+                edge.repetitive = True
+            edge.start, edge.end = int(start), int(end)
+            if attrs.get('dir') == 'both':
+                edge.two_way = True
+            dict_edges[edge_id] = edge
     dict_edges = calculate_multiplicities(dict_edges)
     return dict_edges
 
@@ -103,7 +117,7 @@ def parse_flye_dot(dot_fpath, min_edge_len):
 def parse_canu_unitigs_info(input_dirpath, dict_edges):
     tiginfo_fpath = find_file_by_pattern(input_dirpath, ".unitigs.layout.tigInfo")
     if not is_empty_file(tiginfo_fpath):
-        with open(tiginfo_fpath) as f:
+        with open_file(tiginfo_fpath) as f:
             for i, line in enumerate(f):
                 if i == 0:
                     header = line.strip().split()
@@ -113,8 +127,8 @@ def parse_canu_unitigs_info(input_dirpath, dict_edges):
                         break
                     continue
                 fs = line.strip().split()
-                edge_id = get_edge_agv_id(get_edge_num(fs[0]))
-                rc_edge_id = get_edge_agv_id(-get_edge_num(fs[0]))
+                edge_id = get_edge_id(get_edge_num(fs[0]))
+                rc_edge_id = get_match_edge_id(edge_id)
                 if edge_id in dict_edges:
                     coverage = int(float(fs[cov_col]))
                     dict_edges[edge_id].cov = coverage
@@ -127,32 +141,38 @@ def parse_canu_unitigs_info(input_dirpath, dict_edges):
     return dict_edges
 
 
+def get_edges_fpath(gfa_fpath, output_dirpath):
+    return join(output_dirpath, get_filename(gfa_fpath) + ".fasta")
+
+
 def get_edges_from_gfa(gfa_fpath, output_dirpath, min_edge_len):
-    if not gfa_fpath:
+    if not gfa_fpath or not output_dirpath:
         return None
 
-    input_edges_fpath = join(dirname(gfa_fpath), get_filename(gfa_fpath) + ".fasta")
-    edges_fpath = join(output_dirpath, basename(input_edges_fpath))
+    edges_fpath = get_edges_fpath(gfa_fpath, output_dirpath)
     if not is_empty_file(gfa_fpath) and not can_reuse(edges_fpath, files_to_check=[gfa_fpath]):
         print("Extracting edge sequences from " + gfa_fpath + "...")
-        with open(edges_fpath, "w") as out:
-            with open(gfa_fpath) as f:
-                for line in f:
-                    if line.startswith('S'):
-                        fs = line.strip().split()
-                        seq_name = fs[1]
-                        seq = None
-                        if is_acgt_seq(fs[2]):
-                            seq = fs[2]
-                        elif len(fs) >= 4 and is_acgt_seq(fs[3]):
-                            seq = fs[3]
-                        if seq and len(seq) >= min_edge_len:
-                            out.write(">%s\n" % get_edge_agv_id(get_edge_num(seq_name)))
-                            out.write(seq)
-                            out.write("\n")
+        with open(edges_fpath, "wb") as out:
+            with open_file(gfa_fpath, "rb") as f:
+                for _ in iter_gfa_records(f, get_edge_seq_writer(out, min_edge_len)):
+                    pass
+    return copy_edges_from_fasta(gfa_fpath, edges_fpath)
+
+
+def get_edge_seq_writer(out, min_edge_len):
+    return EdgeSeqWriter(out, min_edge_len, get_edge_seq_name)
+
+
+def get_edge_seq_name(seq_name):
+    return get_edge_agv_id(get_edge_num(seq_name))
+
+
+def copy_edges_from_fasta(gfa_fpath, edges_fpath):
+    # GFA without sequences, use FASTA file stored next to the graph
+    input_edges_fpath = get_input_fpath(join(dirname(gfa_fpath), get_filename(gfa_fpath) + ".fasta"))
     if is_empty_file(edges_fpath) and not is_empty_file(input_edges_fpath):
         with open(edges_fpath, "w") as out:
-            with open(input_edges_fpath) as f:
+            with open_file(input_edges_fpath) as f:
                 for line in f:
                     if line.startswith('>'):
                         seq_name = line.strip().split()[0][1:]
@@ -163,11 +183,11 @@ def get_edges_from_gfa(gfa_fpath, output_dirpath, min_edge_len):
 
 
 def format_edges_file(input_fpath, output_dirpath):
-    if is_empty_file(input_fpath):
+    if is_empty_file(input_fpath) or not output_dirpath:
         return None
     edges_fpath = join(output_dirpath, "edges.fasta")
     if not can_reuse(edges_fpath, files_to_check=[input_fpath]):
-        with open(input_fpath) as f:
+        with open_file(input_fpath) as f:
             with open(edges_fpath, "w") as out_f:
                 for line in f:
                     if line.startswith('>'):
@@ -178,118 +198,161 @@ def format_edges_file(input_fpath, output_dirpath):
     return edges_fpath
 
 
-def fastg_to_gfa(input_fpath, output_dirpath, assembler_name):
-    k8_exec = join(TOOLS_DIR, "k8-darwin") if is_osx() else join(TOOLS_DIR, "k8-linux")
-    gfatools_exec = join(TOOLS_DIR, "gfatools.js")
-    if gfatools_exec and k8_exec:
-        output_fpath = join(output_dirpath, basename(input_fpath).replace("fastg", "gfa"))
-        cmd = None
-        if is_abyss(assembler_name):
-            cmd = "abyss2gfa"
-        elif is_spades(assembler_name):
-            cmd = "spades2gfa"
-        elif is_sga(assembler_name):
-            cmd = "sga2gfa"
-        elif is_soap(assembler_name):
-            cmd = "soap2gfa"
-        elif is_velvet(assembler_name):
-            cmd = "velvet2gfa"
-        if not cmd:
-            sys.exit("FASTG files produced by " + assembler_name + " are not supported. Supported assemblers: " +
-                     ' '.join([ABYSS_NAME, SGA_NAME, SOAP_NAME, SPADES_NAME, VELVET_NAME]) + " or use files in GFA format.")
-        cmdline = [k8_exec, gfatools_exec, cmd, input_fpath]
-        subprocess.call(cmdline, stdout=output_fpath, stderr=open("/dev/null", "w"))
-        if not is_empty_file(output_fpath):
-            return output_fpath
-
-
-def parse_gfa(gfa_fpath, min_edge_len, input_dirpath=None, assembler=None):
-    dict_edges = dict()
-    predecessors = defaultdict(list)
-    successors = defaultdict(list)
-    g = nx.DiGraph()
+def parse_fastg(fastg_fpath, min_edge_len, output_dirpath=None):
+    ## parse the graph and extract edge sequences (if output_dirpath is specified) in one pass
+    '''
+    >EDGE_1_length_5120_cov_17.5:EDGE_2_length_230_cov_12',EDGE_7_length_1403_cov_20;
+    ACGTTGCA...
+    >EDGE_1_length_5120_cov_17.5':EDGE_5_length_907_cov_16;
+    '''
+    dict_edges = EdgeDict()
+    links = []
+
+    print("Parsing " + fastg_fpath + "...")
+    edges_fpath = None
+    seq_out = None
+    if output_dirpath:
+        edges_fpath = get_edges_fpath(fastg_fpath, output_dirpath)
+        if not can_reuse(edges_fpath, files_to_check=[fastg_fpath]):
+            print("Extracting edge sequences from " + fastg_fpath + "...")
+            seq_out = open(edges_fpath, "wb")
+    seq_writer = EdgeSeqWriter(seq_out, min_edge_len, format_edge_id) if seq_out else None
+
+    record = None
+    write_seq = False
+    with open_file(fastg_fpath, "rb") as f:
+        while True:
+            line = f.readline(CHUNK_SIZE)
+            if line and not line.startswith(b'>'):
+                if record:
+                    seq = line.rstrip(b'\r\n')
+                    record[-1] += len(seq)
+                    if write_seq:
+                        seq_writer.write_chunk(seq)
+                continue
+            if record:
+                edge_id, header_len, cov, seq_len = record
+                add_fastg_edge(dict_edges, edge_id, seq_len or header_len, cov, min_edge_len)
+                if write_seq:
+                    seq_writer.finish_seq(seq_len)
+            if not line:
+                break
+            while not line.endswith(b'\n'):
+                next_chunk = f.readline(CHUNK_SIZE)
+                if not next_chunk:
+                    break
+                line += next_chunk
+            name, _, neighbors = line[1:].decode().strip().rstrip(';').partition(':')
+            edge_id, header_len, cov = parse_fastg_name(name)
+            for neighbor in neighbors.split(','):
+                if neighbor:
+                    neighbor_id = parse_fastg_name(neighbor)[0]
+                    links.append((edge_id, neighbor_id))
+                    # some files contain only one strand of the graph
+                    links.append((get_match_edge_id(neighbor_id), get_match_edge_id(edge_id)))
+            record = [edge_id, header_len, cov, 0]
+            write_seq = seq_writer and not is_rc_edge(edge_id)
+            if write_seq:
+                seq_writer.start_seq(edge_id)
+    if seq_out:
+        seq_out.close()
+
+    dict_edges = construct_graph(dict_edges, links)
+    print("Finish parsing.")
+    return dict_edges, edges_fpath
+
+
+def parse_fastg_name(name):
+    # EDGE_1_length_5120_cov_17.5' (SPAdes) or NODE_1_length_5120_cov_17.5_ID_1 (older SPAdes versions),
+    # other assemblers use names ending with the edge number
+    is_rc = name.endswith("'")
+    if is_rc:
+        name = name[:-1]
+    match = fastg_name_pattern.match(name)
+    if match:
+        edge_num = int(match.group('edge_num'))
+        length = int(match.group('length')) if match.group('length') else None
+        cov = float(match.group('cov')) if match.group('cov') else None
+    else:
+        edge_num, length, cov = get_edge_num(name), None, None
+    return get_edge_id(edge_num) | is_rc, length, cov
+
+
+def add_fastg_edge(dict_edges, edge_id, edge_len, cov, min_edge_len):
+    # forward and reverse complement edges are added together, in the same order as for GFA
+    if not edge_len or edge_len < min_edge_len or edge_id in dict_edges:
+        return
+    for new_edge_id in sorted([edge_id, get_match_edge_id(edge_id)]):
+        dict_edges[new_edge_id] = Edge(new_edge_id, edge_id_to_name(new_edge_id), edge_len, cov or 1)
+
+
+def parse_gfa(gfa_fpath, min_edge_len, input_dirpath=None, assembler=None, output_dirpath=None, workers=1):
+    ## parse the graph and extract edge sequences (if output_dirpath is specified) in one pass
+    dict_edges = EdgeDict()
+    links = []
 
     print("Parsing " + gfa_fpath + "...")
     # gfa = gfapy.Gfa.from_file(gfa_fpath, vlevel = 0)
-    links = []
+    gfa_links = []
     edge_overlaps = defaultdict(dict)
-    with open(gfa_fpath) as f:
-        for line in f:
-            record_type = line[0]
-            if record_type == 'S':
-                fs = line.split()
-                name, seq_len = fs[1], len(fs[2])
-                if fs[2] == '*':
-                    seq_len = None
-                add_fields = fs[3:] if len(fs) > 3 else []
-                add_info = dict((f.split(':')[0].lower(), f.split(':')[-1]) for f in add_fields)
-                cov = 1
-                if "dp" in add_info:
-                    cov = float(add_info["dp"])  ## coverage depth
-                elif "kc" in add_info:
-                    cov = max(1, int(add_info["kc"]) / seq_len)  ## k-mer count / edge length
-                if "ln" in add_info:
-                    seq_len = int(add_info["ln"])  ## sequence length
-                if seq_len and seq_len >= min_edge_len:
-                    edge_id = get_edge_agv_id(get_edge_num(name))
-                    edge = Edge(edge_id, get_edge_num(name), seq_len, cov, element_id=edge_id)
-                    dict_edges[edge_id] = edge
-                    for overlapped_edge, overlap in edge_overlaps[edge_id].items():
-                        dict_edges[edge_id].overlaps.append((edge_id_to_name(overlapped_edge), overlapped_edge, overlap))
-                    rc_edge_id = get_edge_agv_id(-get_edge_num(name))
-                    rc_edge = Edge(rc_edge_id, -get_edge_num(name), seq_len, cov, element_id=rc_edge_id)
-                    dict_edges[rc_edge_id] = rc_edge
-                    for overlapped_edge, overlap in edge_overlaps[rc_edge_id].items():
-                        dict_edges[edge_id].overlaps.append((edge_id_to_name(overlapped_edge), overlapped_edge, overlap))
-
-            if record_type != 'L' and record_type != 'E':
-                continue
-            if record_type == 'L':
-                _, from_name, from_orient, to_name, to_orient = line.split()[:5]
-            else:
-                # E       *       2+      65397+  21      68$     0       47      47M
-                from_name, to_name = line.split()[2], line.split()[3]
-                from_orient, to_orient = from_name[-1], to_name[-1]
-                from_name, to_name = from_name[:-1], to_name[:-1]
-            edge1 = get_edge_agv_id(get_edge_num(from_name))
-            edge2 = get_edge_agv_id(get_edge_num(to_name))
-            if from_orient == '-': edge1 = get_match_edge_id(edge1)
-            if to_orient == '-': edge2 = get_match_edge_id(edge2)
-            overlap = 0
-            overlap_operations = re.split('(\d+)', line.split()[-1].strip())
-            for i in range(0, len(overlap_operations) - 1, 1):
-                if not overlap_operations[i]:
-                    continue
-                if overlap_operations[i+1] == 'M' or overlap_operations[i+1] == 'I':
-                    overlap += int(overlap_operations[i])
-            links.append((from_name, from_orient, to_name, to_orient, overlap))
-            if overlap:
-                edge_overlaps[edge1][edge2] = overlap
-                edge_overlaps[edge2][edge1] = overlap
-
-    ### gfa retains only canonical links
-    for link in links:
-        from_name, from_orient, to_name, to_orient, overlap = link
-        edge1 = get_edge_agv_id(get_edge_num(from_name))
-        edge2 = get_edge_agv_id(get_edge_num(to_name))
+    edges_fpath = None
+    seq_fpath = None
+    if output_dirpath:
+        edges_fpath = get_edges_fpath(gfa_fpath, output_dirpath)
+        if not can_reuse(edges_fpath, files_to_check=[gfa_fpath]):
+            print("Extracting edge sequences from " + gfa_fpath + "...")
+            seq_fpath = edges_fpath
+    for record_type, fs in read_gfa(gfa_fpath, workers, seq_fpath, min_edge_len, get_edge_seq_name):
+        if record_type == 'H':
+            # the header is not used, Canu writes VN:Z:bogart/edges instead of the GFA version there
+            continue
+        if record_type == 'S':
+            name, seq_len, add_info = fs
+            cov = 1
+            if "dp" in add_info:
+                cov = float(add_info["dp"])  ## coverage depth
+            elif "kc" in add_info:
+                cov = max(1, int(add_info["kc"]) / seq_len)  ## k-mer count / edge length
+            if "ln" in add_info:
+                seq_len = int(add_info["ln"])  ## sequence length
+            if seq_len and seq_len >= min_edge_len:
+                edge_num = get_edge_num(name)
+                edge_id = get_edge_id(edge_num)
+                edge = Edge(edge_id, edge_num, seq_len, cov)
+                dict_edges[edge_id] = edge
+                for overlapped_edge, overlap in edge_overlaps[edge_id].items():
+                    dict_edges[edge_id].add_overlap((overlapped_edge, overlap))
+                rc_edge_id = get_match_edge_id(edge_id)
+                rc_edge = Edge(rc_edge_id, edge_id_to_name(rc_edge_id), seq_len, cov)
+                dict_edges[rc_edge_id] = rc_edge
+                for overlapped_edge, overlap in edge_overlaps[rc_edge_id].items():
+                    dict_edges[edge_id].add_overlap((overlapped_edge, overlap))
+
+        if record_type != 'L' and record_type != 'E':
+            continue
+        from_name, from_orient, to_name, to_orient, overlap = fs
+        edge1 = get_edge_id(get_edge_num(from_name))
+        edge2 = get_edge_id(get_edge_num(to_name))
         if from_orient == '-': edge1 = get_match_edge_id(edge1)
         if to_orient == '-': edge2 = get_match_edge_id(edge2)
-        if edge1 != edge2:
-            predecessors[edge2].append(edge1)
-            successors[edge1].append(edge2)
-        g.add_edge(edge1, edge2)
+        gfa_links.append((edge1, edge2))
+        if overlap:
+            edge_overlaps[edge1][edge2] = overlap
+            edge_overlaps[edge2][edge1] = overlap
+    if edges_fpath:
+        edges_fpath = copy_edges_from_fasta(gfa_fpath, edges_fpath)
+
+    ### gfa retains only canonical links
+    for edge1, edge2 in gfa_links:
+        links.append((edge1, edge2))
         if is_spades(assembler) or is_abyss(assembler):
-            edge1, edge2 = get_match_edge_id(edge2), get_match_edge_id(edge1)
-            if edge1 != edge2:
-                predecessors[edge2].append(edge1)
-                successors[edge1].append(edge2)
-            g.add_edge(edge1, edge2)
+            links.append((get_match_edge_id(edge2), get_match_edge_id(edge1)))
 
     if assembler == "canu" and input_dirpath:
         dict_edges = parse_canu_unitigs_info(input_dirpath, dict_edges)
-    dict_edges = construct_graph(dict_edges, predecessors, successors)
+    dict_edges = construct_graph(dict_edges, links)
     print("Finish parsing.")
-    return dict_edges
+    return dict_edges, edges_fpath
 
 
 def calculate_multiplicities(dict_edges):
@@ -303,90 +366,56 @@ def calculate_multiplicities(dict_edges):
     return dict_edges
 
 
-def construct_graph(dict_edges, predecessors, successors):
+def construct_graph(dict_edges, links):
     dict_edges = calculate_multiplicities(dict_edges)
 
     # if we have only links between sequences
-    # we need to construct graph based on this information
+    # we need to construct graph based on this information:
+    # the end of an edge and the start of its successor is the same node
+    edge_ends = DisjointSet()
+    for edge1, edge2 in links:
+        if edge1 != edge2:
+            edge_ends.union((edge1, 'end'), (edge2, 'start'))
     node_id = 1
-    graph = defaultdict(set)
-    adj_matrix = defaultdict(list)
+    node_by_root = dict()
     for edge_id in dict_edges.keys():
-        start_node = None
-        is_edge_repetitive = dict_edges[edge_id].repetitive
-        for prev_e in predecessors[edge_id]:
-            if prev_e in dict_edges:
-                start_node = dict_edges[prev_e].end or start_node
-            j = 0
-            while start_node is None and j < len(successors[prev_e]):
-                next_e = successors[prev_e][j]
-                if next_e in dict_edges:
-                    start_node = dict_edges[next_e].start or start_node
-                j += 1
-            if start_node is not None:
-                break
-        if not start_node:
-            start_node = node_id
-            node_id += 1
-        end_node = None
-        for next_e in successors[edge_id]:
-            if next_e in dict_edges:
-                end_node = dict_edges[next_e].start or end_node
-            j = 0
-            while end_node is None and j < len(predecessors[next_e]):
-                prev_e = predecessors[next_e][j]
-                if prev_e in dict_edges:
-                    end_node = dict_edges[prev_e].end or end_node
-                j += 1
-            if end_node is not None:
-                break
-        if not end_node:
-            end_node = node_id
-            node_id += 1
-        if is_edge_repetitive:
-            adj_matrix[start_node].append(edge_id)
-            adj_matrix[end_node].append(edge_id)
-        dict_edges[edge_id].start = start_node
-        dict_edges[edge_id].end = end_node
-    for node_id, edges in adj_matrix.items():
-        for i, edge_id in enumerate(edges):
-            for j, adj_edge_id in enumerate(edges):
-                if i != j:
-                    graph[edge_id].add(adj_edge_id)
+        edge_nodes = []
+        for edge_end in [(edge_id, 'start'), (edge_id, 'end')]:
+            root = edge_ends.find(edge_end)
+            if root not in node_by_root:
+                node_by_root[root] = node_id
+                node_id += 1
+            edge_nodes.append(node_by_root[root])
+        dict_edges[edge_id].start, dict_edges[edge_id].end = edge_nodes
+    color_repeats(dict_edges)
+    return dict_edges
+
 
+def color_repeats(dict_edges):
     ### color each cluster of repeat edges in one color
-    colored_edges = set()
-    color_idx = 0
-    for edge_id in dict_edges.keys():
-        if not dict_edges[edge_id].repetitive:
-            continue
-        if edge_id in colored_edges:
+    # repeat edges sharing a node belong to one cluster,
+    # forward and reverse complement edges are colored in one color
+    repeat_clusters = DisjointSet()
+    repeat_by_node = dict()
+    for edge_id, edge in dict_edges.items():
+        if not edge.repetitive:
             continue
-        edges = dfs_color(graph, edge_id)
-        color = repeat_colors[color_idx % len(repeat_colors)]
-        # color forward and reverse complement edges in one color
-        match_edge_id = edge_id.replace('rc', 'e') if edge_id.startswith('rc') else edge_id.replace('e', 'rc')
+        for node in (edge.start, edge.end):
+            if node in repeat_by_node:
+                repeat_clusters.union(edge_id, repeat_by_node[node])
+            else:
+                repeat_by_node[node] = edge_id
+        match_edge_id = get_match_edge_id(edge_id)
         if match_edge_id in dict_edges:
-            edges |= dfs_color(graph, match_edge_id)
-        for e in edges:
-            dict_edges[e].color = color
-            colored_edges.add(e)
-        color_idx += 1
-    return dict_edges
-
-
-def dfs_color(graph, start, visited=None):
-    if visited is None:
-        visited = set()
-    visited.add(start)
-    stack = [iter(graph[start] - visited)]
-    while stack:
-        try:
-            child = next(stack[-1])
-            if not child in visited:
-                visited.add(child)
-                stack.append(iter(graph[child] - visited))
-        except StopIteration:
-            stack.pop()
-    return visited
+            repeat_clusters.union(edge_id, match_edge_id)
 
+    cluster_colors = dict()
+    for edge_id, edge in dict_edges.items():
+        if not edge.repetitive:
+            continue
+        cluster = repeat_clusters.find(edge_id)
+        if cluster not in cluster_colors:
+            cluster_colors[cluster] = repeat_colors[len(cluster_colors) % len(repeat_colors)]
+    for edge_id, edge in dict_edges.items():
+        if edge.repetitive or edge_id in repeat_clusters:
+            edge.color = cluster_colors[repeat_clusters.find(edge_id)]
@@ -1,25 +1,19 @@
-import shlex
-import subprocess
 import sys
 from collections import defaultdict
-from os.path import join, abspath, basename
+from os.path import abspath
 
 from agb_src.scripts.graph_parser import parse_abyss_dot, parse_flye_dot, parse_gfa, get_edges_from_gfa
-from agb_src.scripts.utils import get_edge_agv_id, is_empty_file, find_file_by_pattern, is_osx, get_edge_num, \
-    get_canu_id, can_reuse
+from agb_src.scripts.utils import get_edge_id, is_empty_file, find_file_by_pattern, is_osx, get_edge_num, \
+    get_canu_id, find_file_in_dir, open_file
 
 
-def parse_canu_output(input_dirpath, output_dirpath, min_edge_len):
-    raw_gfa_fpath = find_file_by_pattern(input_dirpath, ".unitigs.gfa")
-    if not raw_gfa_fpath:
+def parse_canu_output(input_dirpath, output_dirpath, min_edge_len, workers=1):
+    gfa_fpath = find_file_by_pattern(input_dirpath, ".unitigs.gfa")
+    if not gfa_fpath:
         print("ERROR! GFA file is not found in %s! Please check the options" % abspath(input_dirpath))
         sys.exit(1)
-    edges_fpath = get_edges_from_gfa(raw_gfa_fpath, output_dirpath, min_edge_len)
-    gfa_fpath = join(output_dirpath, basename(raw_gfa_fpath))
-    if is_empty_file(gfa_fpath) or not can_reuse(gfa_fpath, files_to_check=[raw_gfa_fpath]):
-        cmd = 'sed "1s/bogart.edges/1.0/" ' + raw_gfa_fpath
-        subprocess.call(shlex.split(cmd), stdout=open(gfa_fpath, 'w'))
-    dict_edges = parse_gfa(gfa_fpath, min_edge_len, input_dirpath, assembler="canu")
+    dict_edges, edges_fpath = parse_gfa(gfa_fpath, min_edge_len, input_dirpath, assembler="canu",
+                                        output_dirpath=output_dirpath, workers=workers)
     contig_edges = parse_canu_assembly_info(input_dirpath, dict_edges)
     return dict_edges, contig_edges, edges_fpath
 
@@ -36,7 +30,7 @@ def parse_flye_output(input_dirpath, output_dirpath, min_edge_len):
     return dict_edges, contig_edges, edges_fpath
 
 
-def parse_spades_output(input_dirpath, output_dirpath, min_edge_len):
+def parse_spades_output(input_dirpath, output_dirpath, min_edge_len, workers=1):
     gfa_fpath = find_file_by_pattern(input_dirpath, "assembly_graph.gfa") or \
                 find_file_by_pattern(input_dirpath, "assembly_graph_with_scaffolds.gfa")
     if not gfa_fpath:
@@ -44,9 +38,9 @@ def parse_spades_output(input_dirpath, output_dirpath, min_edge_len):
               "Please check the folder or specify the file with assembly graph using --graph option" % (input_dirpath))
         sys.exit(1)
 
-    dict_edges = parse_gfa(gfa_fpath, min_edge_len, input_dirpath, assembler="spades")
+    dict_edges, edges_fpath = parse_gfa(gfa_fpath, min_edge_len, input_dirpath, assembler="spades",
+                                        output_dirpath=output_dirpath, workers=workers)
     contig_edges = parse_spades_paths(input_dirpath, dict_edges)
-    edges_fpath = get_edges_from_gfa(gfa_fpath, output_dirpath, min_edge_len)
     return dict_edges, contig_edges, edges_fpath
 
 
@@ -55,11 +49,11 @@ def parse_canu_assembly_info(input_dirpath, dict_edges):
     unitigs_fpath = find_file_by_pattern(input_dirpath, ".unitigs.bed")
     if is_empty_file(unitigs_fpath):
         print("Warning! Unitigs.bed is not found, information about contigs will not be provided")
-    with open(unitigs_fpath) as f:
+    with open_file(unitigs_fpath) as f:
         for line in f:
             fs = line.strip().split()
             contig, start, end, unitig = fs[:4]
-            edge_id = get_edge_agv_id(get_edge_num(unitig))
+            edge_id = get_edge_id(get_edge_num(unitig))
             if edge_id in dict_edges:
                 contig_id = get_canu_id(contig)
                 contig_edges[contig_id].append((start, end, edge_id))
@@ -68,10 +62,10 @@ def parse_canu_assembly_info(input_dirpath, dict_edges):
 
 def parse_flye_assembly_info(input_dirpath, dict_edges):
     contig_edges = defaultdict(list)
-    info_fpath = join(input_dirpath, "assembly_info.txt")
+    info_fpath = find_file_in_dir(input_dirpath, "assembly_info.txt")
     if is_empty_file(info_fpath):
         print("Warning! Assembly_info.txt is not found, information about contigs will not be provided")
-    with open(info_fpath) as f:
+    with open_file(info_fpath) as f:
         for i, line in enumerate(f):
             if i == 0:
                 # header = line.strip().split()
@@ -82,7 +76,7 @@ def parse_flye_assembly_info(input_dirpath, dict_edges):
             edges = path.split(',')
             start = 0
             for edge_name in edges:
-                edge_id = get_edge_agv_id(edge_name)
+                edge_id = get_edge_id(edge_name)
                 if edge_id in dict_edges:
                     edge_len = dict_edges[edge_id].length
                     contig_edges[contig].append((str(start), str(start + edge_len), edge_id))
@@ -92,12 +86,12 @@ def parse_flye_assembly_info(input_dirpath, dict_edges):
 
 def parse_spades_paths(input_dirpath, dict_edges):
     contig_edges = defaultdict(list)
-    paths_fpath = join(input_dirpath, "scaffolds.paths")
+    paths_fpath = find_file_in_dir(input_dirpath, "scaffolds.paths")
     if is_empty_file(paths_fpath):
         print("Warning! %s is not found, information about scaffold paths will not be provided" % paths_fpath)
     # NODE_1_length_8242890_cov_19.815448
     # 1893359+,1801779-,1893273-,400678-,1892977+,1869659-,1892443+,272108+,1694470+,1893863+
-    with open(paths_fpath) as f:
+    with open_file(paths_fpath) as f:
         contig = None
         start = 0
         for line in f:
@@ -110,10 +104,7 @@ def parse_spades_paths(input_dirpath, dict_edges):
             elif contig:
                 edges = line.strip().replace(';', '').split(',')
                 for edge_name in edges:
-                    edge_num = int(edge_name[:-1])
-                    if edge_name[-1] == '-':
-                        edge_num *= -1
-                    edge_id = get_edge_agv_id(edge_num)
+                    edge_id = get_edge_id(int(edge_name[:-1])) | (edge_name[-1] == '-')
                     if edge_id in dict_edges:
                         edge_len = dict_edges[edge_id].length
                         contig_edges[contig].append((str(start), str(start + edge_len), edge_id))
@@ -0,0 +1,109 @@
+import os
+
+from agb_src.scripts.config import *
+from agb_src.scripts.dot_reader import iter_dot_statements, get_dot_dialect
+from agb_src.scripts.utils import open_file, strip_compression_suffix
+
+SNIFF_SIZE = 64 * 1024  # number of bytes read from the beginning of the file to detect its format
+
+GFA1_FORMAT = 'GFA1'
+GFA2_FORMAT = 'GFA2'
+FASTG_FORMAT = 'FASTG'
+DOT_FORMAT = 'DOT'
+
+GFA_RECORD_TYPES = {'H', 'S', 'L', 'C', 'P', 'W', 'E', 'F', 'G', 'O', 'U'}
+GFA2_RECORD_TYPES = {'E', 'F', 'G', 'O', 'U'}
+
+
+def read_file_head(fpath):
+    with open_file(fpath, 'rb') as f:
+        head = f.read(SNIFF_SIZE)
+    return head.decode(errors='replace').splitlines()
+
+
+def detect_graph_format(fpath, lines=None):
+    # detect the format by the first lines of the file, use the file extension if the content is not recognized
+    lines = lines if lines is not None else read_file_head(fpath)
+    graph_format = None
+    for line in lines:
+        if not line.strip() or line.startswith('#'):
+            continue
+        if line.startswith('>'):
+            return FASTG_FORMAT
+        if line.split()[0] in ('digraph', 'graph', 'strict') or '->' in line:
+            return DOT_FORMAT
+        fs = line.split('\t')
+        if fs[0] not in GFA_RECORD_TYPES or (len(fs) < 2 and fs[0] != 'H'):
+            break
+        if fs[0] == 'H':
+            if 'VN:Z:2' in line:
+                return GFA2_FORMAT
+            graph_format = GFA1_FORMAT
+            continue
+        if fs[0] in GFA2_RECORD_TYPES or (fs[0] == 'S' and len(fs) > 3 and fs[2].isdigit()):
+            return GFA2_FORMAT
+        return GFA1_FORMAT
+    if graph_format:
+        return graph_format
+
+    graph_fpath = strip_compression_suffix(fpath)
+    if graph_fpath.endswith("fastg"):
+        return FASTG_FORMAT
+    if graph_fpath.endswith("gfa2"):
+        return GFA2_FORMAT
+    if graph_fpath.endswith("gfa"):
+        return GFA1_FORMAT
+    if graph_fpath.endswith("dot") or graph_fpath.endswith("gv"):
+        return DOT_FORMAT
+
+
+def detect_graph_assembler(graph_format, lines):
+    if graph_format == FASTG_FORMAT:
+        headers = [line for line in lines if line.startswith('>')]
+        if any(header.startswith('>EDGE_') or header.startswith('>NODE_') for header in headers):
+            return SPADES_NAME
+    elif graph_format == DOT_FORMAT:
+        for statement in iter_dot_statements(lines):
+            dialect = get_dot_dialect(*statement)
+            if dialect:
+                return dialect
+    elif graph_format == GFA1_FORMAT or graph_format == GFA2_FORMAT:
+        for line in lines:
+            fs = line.split('\t')
+            if fs[0] == 'H' and 'bogart' in line:
+                return CANU_NAME
+            if fs[0] == 'S' and len(fs) > 1:
+                if fs[1].startswith('tig'):
+                    return CANU_NAME
+                if fs[1].startswith('edge_'):
+                    return FLYE_NAME
+            if fs[0] == 'P' and len(fs) > 1 and (fs[1].startswith('NODE_') or fs[1].startswith('EDGE_')):
+                return SPADES_NAME
+        if graph_format == GFA2_FORMAT:
+            return ABYSS_NAME
+
+
+def detect_output_assembler(dirpath):
+    # detect the assembler by the files in its output folder
+    fnames = [strip_compression_suffix(fname) for fname in os.listdir(dirpath)]
+    if any(fname.endswith('.unitigs.gfa') or fname.endswith('.unitigs.bed') or fname.endswith('.seqStore')
+           for fname in fnames):
+        return CANU_NAME
+    if 'assembly_info.txt' in fnames and ('assembly_graph.gv' in fnames or 'assembly_graph.dot' in fnames or
+                                          'flye.log' in fnames):
+        return FLYE_NAME
+    if any(fname in fnames for fname in ['scaffolds.paths', 'assembly_graph_with_scaffolds.gfa', 'spades.log',
+                                         'assembly_graph.fastg']):
+        return SPADES_NAME
+
+
+def detect_input(input_dirpath, input_fpath):
+    '''
+    Returns the format of the assembly graph file (None for assembler output folders)
+    and the assembler name (None if it cannot be detected) reading only the beginning of the input file.
+    '''
+    if input_fpath:
+        lines = read_file_head(input_fpath)
+        graph_format = detect_graph_format(input_fpath, lines)
+        return graph_format, detect_graph_assembler(graph_format, lines)
+    return None, detect_output_assembler(input_dirpath)
@@ -1,10 +1,9 @@
 import colorsys
-import json
 import subprocess
 from collections import defaultdict, OrderedDict
 
 from agb_src.scripts.config import *
-from agb_src.scripts.utils import can_reuse, is_empty_file, natural_sort, get_edge_agv_id, get_edge_num, \
+from agb_src.scripts.utils import can_reuse, is_empty_file, natural_sort, get_edge_id, get_edge_num, \
     get_match_edge_id, format_pos
 
 
@@ -26,7 +25,7 @@ def map_edges_to_ref(input_fpath, output_dirpath, reference_fpath, threads):
     return mapping_fpath
 
 
-def parse_mapping_info(mapping_fpath, json_output_dir, dict_edges):
+def parse_mapping_info(mapping_fpath, dict_edges):
     # assign edges to chromosomes and color edges to corresponding colors
 
     mapping_info = defaultdict(set)
@@ -38,7 +37,7 @@ def parse_mapping_info(mapping_fpath, json_output_dir, dict_edges):
         for line in f:
             # contig_1        257261  14      160143  -       chr13   924431  196490  356991  147365  161095  60      tp:A:P  cm:i:14049      s1:i:147260     s2:i:4375       dv:f:0.0066
             fs = line.split()
-            edge_id = get_edge_agv_id(get_edge_num(fs[0]))
+            edge_id = get_edge_id(get_edge_num(fs[0]))
             start, end = int(fs[2]), int(fs[3])
             edge_lengths[edge_id] = int(fs[1])
             chrom, chrom_len = fs[5], int(fs[6])
@@ -91,9 +90,10 @@ def parse_mapping_info(mapping_fpath, json_output_dir, dict_edges):
                     best_aligns[edge_id][chrom] = aligns[0][1]
                 for align in aligns[:3]:  # store top 3 alignments for each edge
                     edge_alignment += " %s-%s," % (format_pos(align[1]), format_pos(align[2]))
-                dict_edges[edge_id].aligns[chrom] = edge_alignment[:-1]
-                if get_match_edge_id(edge_id) in dict_edges:
-                    dict_edges[get_match_edge_id(edge_id)].aligns[chrom] = edge_alignment[:-1]
+                dict_edges[edge_id].add_align(chrom, edge_alignment[:-1])
+                match_edge_id = get_match_edge_id(edge_id)
+                if match_edge_id in dict_edges:
+                    dict_edges[match_edge_id].add_align(chrom, edge_alignment[:-1])
 
     chrom_len_dict = OrderedDict((chrom, chrom_lengths[chrom]) for i, chrom in enumerate(list(natural_sort(chrom_names))))
     non_alt_chroms = [c for c in chrom_names if 'alt' not in c and 'random' not in c and 'chrUn' not in c]
@@ -104,7 +104,7 @@ def parse_mapping_info(mapping_fpath, json_output_dir, dict_edges):
 
     edge_chroms = defaultdict(set)
     for edge_id, chroms in chroms_by_edge.items():
-        match_edge_id = edge_id.replace('rc', 'e') if edge_id.startswith('rc') else edge_id.replace('e', 'rc')
+        match_edge_id = get_match_edge_id(edge_id)
         for chrom in chroms:
             edge_chroms[edge_id].add(chrom)
             edge_chroms[match_edge_id].add(chrom)
@@ -132,10 +132,7 @@ def parse_mapping_info(mapping_fpath, json_output_dir, dict_edges):
             dict_edges[edge_id].chrom = ':'.join(list(colors))
         else:
             dict_edges[edge_id].chrom = 'white:red:black:red:black:white'
-    with open(join(json_output_dir, "reference.json"), 'a') as handle:
-        handle.write("chrom_lengths=" + json.dumps(chrom_len_dict) + ";\n")
-        handle.write("edgeMappingInfo=" + json.dumps(mapping_info) + ";\n")
-    return mapping_info, non_alt_chroms, edge_by_chrom
+    return mapping_info, non_alt_chroms, edge_by_chrom, chrom_len_dict
 
 
 def get_rainbow_color(pos, chrom_len):
@@ -0,0 +1,98 @@
+'''
+Compares graph partitioners by the edge cut, the balance of parts and the running time.
+Usage: python -m agb_src.scripts.partition_benchmark [-p partitioners] [graph files]
+Without files, test_data graphs and synthetic graphs are used.
+'''
+import math
+import os
+import sys
+import time
+from optparse import OptionParser
+from os.path import join, basename
+
+import networkx as nx
+
+from agb_src.scripts.config import ROOT_DIR, MAX_SUB_NODES
+from agb_src.scripts.graph_parser import parse_gfa, parse_fastg, parse_dot
+from agb_src.scripts.input_detector import detect_graph_format, FASTG_FORMAT, DOT_FORMAT
+from agb_src.scripts.partitioner import PARTITIONERS, check_partitioner, partition_graph
+
+TEST_DATA_DIR = join(os.path.dirname(ROOT_DIR), "test_data")
+
+
+def load_assembly_graph(fpath):
+    graph_format = detect_graph_format(fpath)
+    if graph_format == FASTG_FORMAT:
+        dict_edges, _ = parse_fastg(fpath, 0)
+    elif graph_format == DOT_FORMAT:
+        dict_edges = parse_dot(fpath, 0)
+    else:
+        dict_edges, _ = parse_gfa(fpath, 0)
+    g = nx.Graph()
+    for edge in dict_edges.values():
+        g.add_edge(edge.start, edge.end)
+    return g
+
+
+def get_synthetic_graphs():
+    return [
+        ("grid_60x60", nx.convert_node_labels_to_integers(nx.grid_2d_graph(60, 60))),
+        ("random_3_regular_5000", nx.random_regular_graph(3, 5000, seed=1)),
+        ("watts_strogatz_5000", nx.connected_watts_strogatz_graph(5000, 4, 0.05, seed=1)),
+        # long paths joined by repeats resemble assembly graphs
+        ("paths_with_repeats_5000", get_paths_with_repeats(5000, 50)),
+    ]
+
+
+def get_paths_with_repeats(num_nodes, num_repeats):
+    g = nx.path_graph(num_nodes)
+    step = num_nodes // num_repeats
+    for i in range(num_repeats):
+        g.add_edge(i * step, (i * step * 7 + step // 2) % num_nodes)
+    return g
+
+
+def evaluate_partition(g, parts):
+    part_by_node = dict((node, part_id) for part_id, nodes in enumerate(parts) for node in nodes)
+    edge_cut = sum(1 for start, end in g.edges() if part_by_node[start] != part_by_node[end])
+    ideal_size = len(g) / float(len(parts))
+    balance = max(len(nodes) for nodes in parts) / ideal_size
+    disconnected_parts = sum(1 for nodes in parts if nodes and not nx.is_connected(g.subgraph(nodes)))
+    return edge_cut, balance, disconnected_parts
+
+
+def run_benchmark(graphs, partitioners):
+    print("%-28s %8s %6s %-18s %9s %8s %8s %9s" %
+          ("graph", "nodes", "parts", "partitioner", "edge_cut", "balance", "discon", "time, s"))
+    for name, g in graphs:
+        num_parts = max(2, int(math.ceil(len(g) / float(MAX_SUB_NODES))))
+        for partitioner in partitioners:
+            start_time = time.time()
+            parts = partition_graph(g, num_parts, partitioner)
+            elapsed = time.time() - start_time
+            edge_cut, balance, disconnected_parts = evaluate_partition(g, parts)
+            print("%-28s %8d %6d %-18s %9d %8.2f %8d %9.3f" %
+                  (name, len(g), num_parts, partitioner, edge_cut, balance, disconnected_parts, elapsed))
+
+
+def main():
+    parser = OptionParser(description='Benchmark of graph partitioners')
+    parser.add_option('-p', dest='partitioners', help='Comma-separated list of partitioners [default: all available]')
+    opts, args = parser.parse_args()
+
+    partitioners = opts.partitioners.split(',') if opts.partitioners else \
+        [name for name in PARTITIONERS if not check_partitioner(name)]
+    for partitioner in partitioners:
+        partitioner_error = check_partitioner(partitioner)
+        if partitioner_error:
+            sys.exit("ERROR! " + partitioner_error)
+
+    fpaths = args or [join(TEST_DATA_DIR, "canu.contigs.gfa"), join(TEST_DATA_DIR, "flye_yeast", "assembly_graph.gv")]
+    graphs = [(basename(fpath), load_assembly_graph(fpath)) for fpath in fpaths]
+    if not args:
+        graphs += get_synthetic_graphs()
+    run_benchmark(graphs, partitioners)
+
+
+if __name__ == '__main__':
+    main()
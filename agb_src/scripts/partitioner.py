@@ -0,0 +1,131 @@
+import math
+from collections import deque
+
+import networkx as nx
+
+try:
+    import nxmetis
+except ImportError:
+    nxmetis = None
+
+METIS_NAME = 'metis'
+BFS_NAME = 'bfs'
+LABEL_PROPAGATION_NAME = 'label-propagation'
+SPECTRAL_NAME = 'spectral'
+AUTO_NAME = 'auto'
+
+MAX_IMBALANCE = 1.03  # max part size relative to the ideal one for refinement moves
+LABEL_PROPAGATION_ROUNDS = 10
+
+
+## each partitioner splits undirected graph into exactly num_parts lists of nodes (some of them can be empty)
+
+def partition_metis(g, num_parts, contiguous=True):
+    options = nxmetis.MetisOptions(ncuts=5, niter=100, ufactor=2, objtype=1, contig=contiguous, minconn=True)
+    edgecuts, parts = nxmetis.partition(g, num_parts, options=options)
+    return list(parts)
+
+
+def partition_bfs(g, num_parts, contiguous=True):
+    # grow regions of equal size by breadth-first search, each region starts next to the previous one
+    part_size = int(math.ceil(len(g) / float(num_parts)))
+    part_by_node = dict()
+    parts = [[] for _ in range(num_parts)]
+    frontier = deque()
+    seeds = iter(sorted(g.nodes(), key=g.degree))  # start from the periphery of the graph
+    part_id = 0
+    while len(part_by_node) < len(g):
+        if len(parts[part_id]) >= part_size and part_id < num_parts - 1:
+            # the next region grows from one node on the border of the previous one
+            part_id += 1
+            frontier = deque(n for n in frontier if n not in part_by_node)
+            frontier = deque([frontier[0]]) if frontier else frontier
+        while frontier and frontier[0] in part_by_node:
+            frontier.popleft()
+        if frontier:
+            node = frontier.popleft()
+        else:
+            node = next(n for n in seeds if n not in part_by_node)
+        part_by_node[node] = part_id
+        parts[part_id].append(node)
+        frontier.extend(n for n in g.neighbors(node) if n not in part_by_node)
+    return parts
+
+
+def partition_label_propagation(g, num_parts, contiguous=True):
+    # refine BFS regions by moving nodes to the part of the most of their neighbors while parts stay balanced
+    parts = partition_bfs(g, num_parts)
+    part_by_node = dict((node, part_id) for part_id, nodes in enumerate(parts) for node in nodes)
+    part_sizes = [len(nodes) for nodes in parts]
+    max_size = int(math.ceil(len(g) / float(num_parts) * MAX_IMBALANCE))
+    for _ in range(LABEL_PROPAGATION_ROUNDS):
+        moved = 0
+        for node in g.nodes():
+            part_id = part_by_node[node]
+            if part_sizes[part_id] <= 1:
+                continue
+            neighbor_parts = dict()
+            for neighbor in g.neighbors(node):
+                if neighbor != node:
+                    neighbor_parts[part_by_node[neighbor]] = neighbor_parts.get(part_by_node[neighbor], 0) + 1
+            best_part_id = max(neighbor_parts, key=lambda p: (neighbor_parts[p], p == part_id), default=part_id)
+            if best_part_id == part_id or neighbor_parts[best_part_id] <= neighbor_parts.get(part_id, 0) or \
+                    part_sizes[best_part_id] >= max_size:
+                continue
+            part_by_node[node] = best_part_id
+            part_sizes[part_id] -= 1
+            part_sizes[best_part_id] += 1
+            moved += 1
+        if not moved:
+            break
+    parts = [[] for _ in range(num_parts)]
+    for node in g.nodes():
+        parts[part_by_node[node]].append(node)
+    return parts
+
+
+def partition_spectral(g, num_parts, contiguous=True):
+    # recursive bisection by the Fiedler vector of the graph Laplacian, requires SciPy
+    if num_parts == 1 or len(g) < 2:
+        return [list(g.nodes())] + [[] for _ in range(num_parts - 1)]
+    left_parts = num_parts // 2
+    if nx.is_connected(g):
+        fiedler = nx.fiedler_vector(g, method='tracemin_lu', seed=0)
+        order = [node for _, node in sorted(zip(fiedler, g.nodes()), key=lambda pair: pair[0])]
+    else:  # keep connected components together
+        order = [node for nodes in nx.connected_components(g) for node in nodes]
+    split_pos = int(round(len(order) * left_parts / float(num_parts)))
+    return partition_spectral(g.subgraph(order[:split_pos]), left_parts) + \
+        partition_spectral(g.subgraph(order[split_pos:]), num_parts - left_parts)
+
+
+PARTITIONERS = {
+    METIS_NAME: partition_metis,
+    BFS_NAME: partition_bfs,
+    LABEL_PROPAGATION_NAME: partition_label_propagation,
+    SPECTRAL_NAME: partition_spectral,
+}
+
+
+def get_partitioner_name(name=None):
+    if not name or name == AUTO_NAME:
+        return METIS_NAME if nxmetis else LABEL_PROPAGATION_NAME
+    return name
+
+
+def check_partitioner(name):
+    # returns the error message if the partitioner cannot be used
+    name = get_partitioner_name(name)
+    if name not in PARTITIONERS:
+        return "Unknown graph partitioner: %s. Available partitioners: %s" % (name, ', '.join([AUTO_NAME] + list(PARTITIONERS)))
+    if name == METIS_NAME and not nxmetis:
+        return "METIS partitioner requires networkx-metis package. Please install it or choose another partitioner"
+    if name == SPECTRAL_NAME:
+        try:
+            import scipy
+        except ImportError:
+            return "Spectral partitioner requires SciPy package. Please install it or choose another partitioner"
+
+
+def partition_graph(g, num_parts, partitioner=None, contiguous=True):
+    return PARTITIONERS[get_partitioner_name(partitioner)](g, num_parts, contiguous=contiguous)
@@ -8,8 +8,8 @@ from collections import defaultdict
 
 from agb_src.scripts.config import GAP_THRESHOLD
 from agb_src.scripts.mapping_utils import map_edges_to_ref, parse_mapping_info
-from agb_src.scripts.utils import is_empty_file, can_reuse, get_quast_filename, get_edge_num, get_edge_agv_id, \
-    edge_id_to_name, get_match_edge_id, get_path_to_program
+from agb_src.scripts.utils import is_empty_file, can_reuse, get_quast_filename, get_edge_num, get_edge_id, \
+    get_match_edge_id, format_edge_id, get_path_to_program
 
 align_pattern = "between (?P<start1>\d+) (?P<end1>\d+) and (?P<start2>\d+) (?P<end2>\d+)"
 
@@ -47,7 +47,7 @@ def run(input_fpath, reference_fpath, out_fpath, output_dirpath, threads, is_met
     return out_fpath
 
 
-def parse_alignments(alignments_fpath, json_output_dirpath):
+def parse_alignments(alignments_fpath):
     gaps_info = defaultdict(list)
     chrom_alignments = defaultdict(list)
     ms_info = defaultdict(list)
@@ -59,8 +59,9 @@ def parse_alignments(alignments_fpath, json_output_dirpath):
                 continue
             fs = line.split('\t')
             if len(fs) > 5:
-                start, end, start2, end2, chrom, edge_id = fs[:6]
+                start, end, start2, end2, chrom, seq_id = fs[:6]
                 start, end = int(start), int(end)
+                edge_id = get_edge_id(get_edge_num(seq_id))
                 if int(start2) > int(end2):
                     edge_id = get_match_edge_id(edge_id)
                 chrom_alignments[chrom].append((start, end, edge_id))
@@ -73,11 +74,18 @@ def parse_alignments(alignments_fpath, json_output_dirpath):
             if start - prev_end > GAP_THRESHOLD:
                 gaps_info[chrom].append((prev_end, start - 1))
             prev_end = max(prev_end, end)
-            align = {'s': start, 'e': end, 'edge': edge_id, 'ms': ';'.join(ms_info[(chrom, start, end)])}
+            align = {'s': start, 'e': end, 'edge': format_edge_id(edge_id), 'ms': ';'.join(ms_info[(chrom, start, end)])}
             aligns_by_chroms[chrom].append(align)
+    return gaps_info, aligns_by_chroms
+
+
+def save_reference_info(json_output_dirpath, gaps_info, aligns_by_chroms, chrom_lengths, mapping_info):
     with open(join(json_output_dirpath, 'reference.json'), 'w') as handle:
         handle.write("chromGaps=" + json.dumps(gaps_info) + ";\n")
         handle.write("chromAligns=" + json.dumps(aligns_by_chroms) + ";\n")
+        handle.write("chrom_lengths=" + json.dumps(chrom_lengths) + ";\n")
+        handle.write("edgeMappingInfo=" + json.dumps(dict((format_edge_id(edge_id), chroms)
+                                                          for edge_id, chroms in mapping_info.items())) + ";\n")
 
 
 def run_quast_analysis(input_fpath, reference_fpath, output_dirpath, json_output_dirpath, threads, contig_edges, dict_edges=None, is_meta=False):
@@ -110,8 +118,8 @@ def run_quast_analysis(input_fpath, reference_fpath, output_dirpath, json_output
                     continue
                 start1, end1, start2, end2 = match.group('start1'), match.group('end1'), match.group('start2'), match.group('end2')
                 if dict_edges:
-                    edge_id = get_edge_agv_id(get_edge_num(seq_id))
-                    dict_edges[edge_id].errors.append((start1, end1, start2, end2))
+                    edge_id = get_edge_id(get_edge_num(seq_id))
+                    dict_edges[edge_id].add_error((start1, end1, start2, end2))
                 else:
                     misassembled_seqs[seq_id].append((start1, end1, start2, end2))
                 ## add misassembl edge
@@ -123,7 +131,8 @@ def run_quast_analysis(input_fpath, reference_fpath, output_dirpath, json_output
             handle.write("misassembledContigs='" + json.dumps(misassembled_seqs) + "';\n")
         return None, None, None, dict_edges
     else:
-        parse_alignments(get_alignments_fpath(quast_output_dir, input_fpath), json_output_dirpath)
+        gaps_info, aligns_by_chroms = parse_alignments(get_alignments_fpath(quast_output_dir, input_fpath))
         mapping_fpath = map_edges_to_ref(input_fpath, output_dirpath, reference_fpath, threads)
-        mapping_info, chrom_names, edge_by_chrom = parse_mapping_info(mapping_fpath, json_output_dirpath, dict_edges)
+        mapping_info, chrom_names, edge_by_chrom, chrom_lengths = parse_mapping_info(mapping_fpath, dict_edges)
+        save_reference_info(json_output_dirpath, gaps_info, aligns_by_chroms, chrom_lengths, mapping_info)
         return mapping_info, chrom_names, edge_by_chrom, dict_edges
\ No newline at end of file
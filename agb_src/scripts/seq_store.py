@@ -0,0 +1,198 @@
+import mmap
+import os
+from os.path import exists
+
+from agb_src.scripts.gfa_reader import CHUNK_SIZE, NUCLEOTIDES, find_field_end, is_cut_segment_head
+from agb_src.scripts.graph_parser import parse_fastg_name
+from agb_src.scripts.utils import can_reuse, is_compressed, get_edge_id, get_edge_num, get_match_edge_id, is_rc_edge
+
+INDEX_SUFFIX = ".fai"
+
+COMPLEMENT = bytes.maketrans(b'ACGTNacgtn', b'TGCANtgcan')
+
+
+def build_seq_index(fpath):
+    '''
+    Returns the list of (name, length, offset, line_bases, line_width) records in the samtools faidx format
+    for the sequences of GFA S lines (one line per sequence) or FASTA/FASTG records.
+    '''
+    with open(fpath, 'rb') as f:
+        first_char = f.read(1)
+        f.seek(0)
+        if first_char == b'>':
+            return list(index_fasta_seqs(f))
+        return list(index_gfa_seqs(f))
+
+
+def index_gfa_seqs(f):
+    while True:
+        line_start = f.tell()
+        chunk = f.readline(CHUNK_SIZE)
+        if not chunk:
+            break
+        if chunk[:2] != b'S\t':
+            skip_line(f, chunk)
+            continue
+        while not chunk.endswith(b'\n') and is_cut_segment_head(chunk):
+            next_chunk = f.readline(CHUNK_SIZE)
+            if not next_chunk:
+                break
+            chunk += next_chunk
+        name_end = chunk.find(b'\t', 2)
+        if name_end == -1:
+            continue
+        name = chunk[2:name_end].decode()
+        seq_start = name_end + 1
+        field_end = find_field_end(chunk, seq_start)
+        if field_end != -1 and chunk[seq_start:field_end].isdigit() and chunk[field_end:field_end + 1] == b'\t':
+            # GFA2: S <sid> <slen> <sequence>
+            seq_start = field_end + 1
+            field_end = find_field_end(chunk, seq_start)
+        if seq_start >= len(chunk) or chunk[seq_start] not in NUCLEOTIDES:
+            skip_line(f, chunk)
+            continue
+        if field_end != -1:
+            seq_len = field_end - seq_start
+            skip_line(f, chunk)
+        else:
+            seq_len = len(chunk) - seq_start
+            while True:
+                chunk = f.readline(CHUNK_SIZE)
+                if not chunk:
+                    break
+                field_end = find_field_end(chunk, 0)
+                if field_end != -1:
+                    seq_len += field_end
+                    skip_line(f, chunk)
+                    break
+                seq_len += len(chunk)
+        # the whole sequence is stored in one line
+        yield name, seq_len, line_start + seq_start, seq_len, seq_len + 1
+
+
+def index_fasta_seqs(f):
+    record = None
+    while True:
+        line_start = f.tell()
+        line = f.readline(CHUNK_SIZE)
+        if line and not line.startswith(b'>'):
+            if record:
+                seq_len = len(line.rstrip(b'\r\n'))
+                if not record[1]:
+                    record[2], record[3], record[4] = line_start, seq_len, len(line)
+                record[1] += seq_len
+            continue
+        if record:
+            yield tuple(record)
+        if not line:
+            break
+        line = skip_line(f, line)
+        record = [line[1:].decode().split()[0], 0, f.tell(), 0, 0]
+
+
+def skip_line(f, chunk):
+    # read the rest of the line, only the beginning of the line is returned
+    line = chunk
+    while not chunk.endswith(b'\n'):
+        chunk = f.readline(CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(line) < CHUNK_SIZE:
+            line += chunk
+    return line
+
+
+def get_seq_edge_id(seq_name):
+    # GFA segment names, FASTG record names (EDGE_1_length_5120_cov_17.5:EDGE_2...;) and edge FASTA names (e1)
+    return parse_fastg_name(seq_name.split(':')[0].rstrip(';'))[0]
+
+
+def read_seq_index(index_fpath):
+    with open(index_fpath) as f:
+        return [(fs[0],) + tuple(int(v) for v in fs[1:5]) for fs in (line.rstrip('\n').split('\t') for line in f)]
+
+
+def write_seq_index(index_fpath, index):
+    with open(index_fpath, 'w') as f:
+        for record in index:
+            f.write('\t'.join(str(v) for v in record) + '\n')
+
+
+def load_seq_store(fpath, index_fpath=None):
+    # the index is stored next to the sequence file (or in index_fpath) and rebuilt if the file has changed
+    if is_compressed(fpath):
+        raise ValueError(fpath + " is compressed, random access to edge sequences requires a plain GFA/FASTA file")
+    index_fpath = index_fpath or fpath + INDEX_SUFFIX
+    if exists(index_fpath) and can_reuse(index_fpath, files_to_check=[fpath]):
+        index = read_seq_index(index_fpath)
+    else:
+        index = build_seq_index(fpath)
+        try:
+            write_seq_index(index_fpath, index)
+        except OSError:  # read-only folder, the index is kept in memory
+            pass
+    return SeqStore(fpath, index)
+
+
+class SeqStore:
+    # random access to forward and reverse complement edge sequences by the offsets of the index
+    def __init__(self, fpath, index):
+        self.fpath = fpath
+        self.index = dict()
+        for name, length, offset, line_bases, line_width in index:
+            edge_id = get_seq_edge_id(name)
+            if not is_rc_edge(edge_id):
+                self.index[edge_id] = (length, offset, line_bases, line_width)
+        self.f = open(fpath, 'rb')
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(fpath) else b''
+
+    def __contains__(self, edge_id):
+        return (edge_id & ~1) in self.index
+
+    def get_length(self, edge_id):
+        return self.index[edge_id & ~1][0]
+
+    def get_seq(self, edge_id, start=0, end=None):
+        # 0-based half-open interval of the edge (or its reverse complement) sequence
+        length, offset, line_bases, line_width = self.index[edge_id & ~1]
+        end = length if end is None else min(end, length)
+        start = max(0, start)
+        if start >= end:
+            return b''
+        if is_rc_edge(edge_id):
+            start, end = length - end, length - start
+        seq = self.mm[self.get_pos(offset, line_bases, line_width, start):
+                      self.get_pos(offset, line_bases, line_width, end - 1) + 1]
+        if start // line_bases != (end - 1) // line_bases:  # the interval spans several lines
+            seq = seq.replace(b'\n', b'').replace(b'\r', b'')
+        if is_rc_edge(edge_id):
+            seq = seq.translate(COMPLEMENT)[::-1]
+        return seq
+
+    @staticmethod
+    def get_pos(offset, line_bases, line_width, i):
+        return offset + (i // line_bases) * line_width + i % line_bases
+
+    def close(self):
+        if self.mm:
+            self.mm.close()
+        self.f.close()
+
+
+def parse_edge_region(region):
+    # e12, rc12, 12 or -12 with optional 1-based inclusive coordinates: e12:101-200
+    edge_name, _, coords = region.partition(':')
+    if edge_name.startswith('rc'):
+        edge_id = get_match_edge_id(get_edge_id(get_edge_num(edge_name)))
+    elif edge_name.startswith('-'):
+        edge_id = get_edge_id(edge_name)
+    else:
+        edge_id = get_edge_id(get_edge_num(edge_name))
+    start, end = 0, None
+    if coords:
+        start_str, _, end_str = coords.replace(',', '').partition('-')
+        start = int(start_str) - 1
+        end = int(end_str) if end_str else None
+        if start < 0 or (end is not None and end <= start):
+            raise ValueError('invalid coordinates of the edge region ' + region)
+    return edge_id, start, end
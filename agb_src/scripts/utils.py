@@ -1,10 +1,18 @@
+import bisect
+import gzip
+import itertools
 import math
 import io
 import os
+import pickle
 import re
+import signal
+import subprocess
 import sys
+import zlib
+from collections import defaultdict
 from os import listdir
-from os.path import exists, getmtime, getsize, basename, splitext
+from os.path import exists, getmtime, getsize, basename, splitext, abspath
 
 from agb_src.scripts.config import *
 
@@ -52,9 +60,9 @@ def get_scaffolds_fpath(assembler, input_dirpath):
         elif is_canu(assembler):
             scaffolds_fpath = find_file_by_pattern(input_dirpath, ".contigs.fasta")
         elif is_flye(assembler):
-            scaffolds_fpath = join(input_dirpath, "scaffolds.fasta")
+            scaffolds_fpath = get_input_fpath(join(input_dirpath, "scaffolds.fasta"))
         elif is_spades(assembler):
-            scaffolds_fpath = join(input_dirpath, "scaffolds.fasta")
+            scaffolds_fpath = get_input_fpath(join(input_dirpath, "scaffolds.fasta"))
     if not is_empty_file(scaffolds_fpath):
         return scaffolds_fpath
 
@@ -67,14 +75,6 @@ def print_dot(dot_fpath, dict_edges):
         out_f.write('}')
 
 
-def get_median(arr):
-    arr.sort()
-    if len(arr) % 2:
-        return arr[len(arr)//2 + 1]
-    elif arr:
-        return (arr[len(arr)//2] + arr[len(arr)//2-1]) / 2
-
-
 def calc_std_dev(arr):
     mean_value = sum(arr) / len(arr)
     std_dev = math.sqrt(sum([(x - mean_value) ** 2 for x in arr]) / (len(arr) - 1))
@@ -115,20 +115,44 @@ def is_acgt_seq(seq):
 
 
 def get_edge_num(edge_id):
-    return int(''.join(x for x in edge_id if x.isdigit()))
+    if edge_id.isdigit():
+        return int(edge_id)
+    return int(re.sub(r'\D', '', edge_id))
 
 
-def get_edge_agv_id(edge_id):
-    if edge_id != "*" and edge_id != "??":
-        return 'rc%d' % abs(int(edge_id)) if int(edge_id) < 0 else 'e%d' % int(edge_id)
+## edges are identified by integers: 2 * N for edge N and 2 * N + 1 for its reverse complement.
+## Strings "eN" and "rcN" are used only in the output files
+def get_edge_id(edge_name):
+    # edge name is a signed edge number, negative numbers correspond to the reverse complement edges
+    if edge_name == "*" or edge_name == "??":
+        return None
+    if isinstance(edge_name, int):
+        return (-edge_name << 1) | 1 if edge_name < 0 else edge_name << 1
+    if edge_name[0] == '-':
+        return (int(edge_name[1:]) << 1) | 1
+    return int(edge_name) << 1
 
 
 def get_match_edge_id(edge_id):
-    return edge_id.replace("e", "rc") if edge_id[0] == "e" else edge_id.replace("rc", "e")
+    return edge_id ^ 1
+
+
+def is_rc_edge(edge_id):
+    return edge_id & 1
+
+
+def format_edge_id(edge_id):
+    return ('rc%d' if edge_id & 1 else 'e%d') % (edge_id >> 1)
 
 
 def edge_id_to_name(edge_id):
-    return str(get_edge_num(edge_id)) if edge_id[0] == "e" else str(get_edge_num(edge_id) * (-1))
+    return ('-%d' if edge_id & 1 else '%d') % (edge_id >> 1)
+
+
+def get_edge_agv_id(edge_name):
+    edge_id = get_edge_id(edge_name)
+    if edge_id is not None:
+        return format_edge_id(edge_id)
 
 
 def get_canu_id(edge_id):
@@ -138,10 +162,75 @@ def get_canu_id(edge_id):
 
 
 def calculate_median_cov(dict_edges):
-    coverages = []
-    for edge in dict_edges.values():
-        coverages.extend([edge.cov] * int(edge.length / 100))
-    return get_median(coverages) or 1
+    return dict_edges.get_coverage_stats().median() or 1
+
+
+def get_coverage_stats(edges):
+    # each edge is counted once per 100 bp of its length
+    return WeightedStats([edge.cov for edge in edges], [int(edge.length / 100) for edge in edges])
+
+
+class WeightedStats:
+    # statistics of values with integer weights, same as for the list with each value repeated weight times
+    def __init__(self, values, weights):
+        pairs = sorted((value, weight) for value, weight in zip(values, weights) if weight > 0)
+        self.values = [value for value, weight in pairs]
+        self.cum_weights = list(itertools.accumulate(weight for value, weight in pairs))
+        self.total_weight = self.cum_weights[-1] if self.cum_weights else 0
+
+    def get_value(self, rank):
+        return self.values[bisect.bisect_right(self.cum_weights, rank)]
+
+    def quantile(self, q):
+        if not self.total_weight:
+            return None
+        pos = q * (self.total_weight - 1)
+        if pos == int(pos):
+            return self.get_value(int(pos))
+        lower, upper = self.get_value(math.floor(pos)), self.get_value(math.ceil(pos))
+        return lower + (upper - lower) * (pos - math.floor(pos))
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def mean(self):
+        if not self.total_weight:
+            return None
+        weights = [cum_weight - prev_weight for prev_weight, cum_weight in zip([0] + self.cum_weights, self.cum_weights)]
+        return sum(value * weight for value, weight in zip(self.values, weights)) / self.total_weight
+
+
+class DisjointSet:
+    # union-find structure with path halving and union by size
+    def __init__(self):
+        self.parent = dict()
+        self.size = dict()
+
+    def __contains__(self, item):
+        return item in self.parent
+
+    def find(self, item):
+        parent = self.parent
+        if item not in parent:
+            return item
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, item1, item2):
+        root1, root2 = self.find(item1), self.find(item2)
+        if root1 == root2:
+            return root1
+        for root in (root1, root2):
+            if root not in self.parent:
+                self.parent[root] = root
+                self.size[root] = 1
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+        return root1
 
 
 def can_reuse(fpath, files_to_check=None, dir_to_check=None):
@@ -155,12 +244,180 @@ def can_reuse(fpath, files_to_check=None, dir_to_check=None):
     return True
 
 
+def get_compression(fpath):
+    with open(fpath, 'rb') as f:
+        magic = f.read(4)
+    if magic[:2] == GZIP_MAGIC:
+        return 'gzip'
+    if magic == ZSTD_MAGIC:
+        return 'zstd'
+
+
+def is_compressed(fpath):
+    return get_compression(fpath) is not None
+
+
+def strip_compression_suffix(fpath):
+    for suffix in COMPRESSION_SUFFIXES:
+        if fpath.endswith(suffix):
+            return fpath[:-len(suffix)]
+    return fpath
+
+
+def get_input_fpath(fpath):
+    # use compressed version of the file if the plain file does not exist
+    if fpath and not exists(fpath):
+        for suffix in COMPRESSION_SUFFIXES:
+            if exists(fpath + suffix):
+                return fpath + suffix
+    return fpath
+
+
+def open_file(fpath, mode='r', threads=1):
+    # open plain, gzip/bgzip or zstd compressed file for reading, compressed data is decompressed on the fly
+    compression = get_compression(fpath)
+    is_binary = 'b' in mode
+    if compression == 'gzip':
+        bgzip_exec = get_path_to_program("bgzip")
+        if bgzip_exec:  # bgzip decompresses BGZF blocks in several threads
+            return PipeReader([bgzip_exec, "-dc", "-@", str(threads), fpath], fpath, is_binary)
+        return CompressedFileReader(gzip.open(fpath, 'rb' if is_binary else 'rt'), fpath, "gzip")
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            zstd_exec = get_path_to_program("zstd")
+            if not zstd_exec:
+                sys.exit("ERROR! " + fpath + " is compressed with zstd. "
+                         "Please install zstandard Python package or zstd tool, or decompress the file")
+            return PipeReader([zstd_exec, "-dcq", fpath], fpath, is_binary)
+        reader = io.BufferedReader(ZstdReader(fpath, zstandard), buffer_size=ZSTD_BUFFER_SIZE)
+        return CompressedFileReader(reader if is_binary else io.TextIOWrapper(reader), fpath, "zstd")
+    return open(fpath, mode)
+
+
+class CompressedFileReader:
+    # file-like object reading decompressed data, a damaged or truncated file is reported as IOError
+    def __init__(self, f, fpath, tool):
+        self.f = f
+        self.fpath = fpath
+        self.tool = tool
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        try:
+            self.close()
+        except IOError:
+            if exc_type is None:  # do not hide the error raised while reading
+                raise
+
+    def read(self, *args):
+        return self.check_data(self.call(self.f.read, *args), args)
+
+    def readline(self, *args):
+        return self.check_data(self.call(self.f.readline, *args), args)
+
+    def call(self, func, *args):
+        try:
+            return func(*args)
+        except (EOFError, OSError, zlib.error) as e:
+            raise self.get_error(str(e))
+
+    def check_data(self, data, args):
+        if not data and args != (0,):  # end of the decompressed data
+            self.check_status()
+        return data
+
+    def check_status(self):
+        pass
+
+    def get_error(self, message):
+        return IOError("Failed to decompress %s with %s: %s. The file is probably truncated or damaged" %
+                       (self.fpath, self.tool, message.strip() or "unexpected end of data"))
+
+    def close(self):
+        self.f.close()
+
+
+class PipeReader(CompressedFileReader):
+    # file-like object reading output of a decompression tool
+    def __init__(self, cmdline, fpath, is_binary):
+        self.proc = subprocess.Popen(cmdline, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        f = self.proc.stdout if is_binary else io.TextIOWrapper(self.proc.stdout)
+        CompressedFileReader.__init__(self, f, fpath, basename(cmdline[0]))
+        self.tool_message = None
+
+    def get_tool_error(self):
+        if self.tool_message is None:
+            self.tool_message = self.proc.stderr.read().decode(errors='replace')
+        return self.get_error(self.tool_message)
+
+    def check_status(self):
+        if self.proc.wait() != 0:
+            raise self.get_tool_error()
+
+    def close(self):
+        self.f.close()
+        # the tool is killed by SIGPIPE if the file is closed before the end of the data
+        error = self.get_tool_error() if self.proc.wait() not in (0, -signal.SIGPIPE) else None
+        self.proc.stderr.close()
+        if error:
+            raise error
+
+
+class ZstdReader(io.RawIOBase):
+    # zstd frames are decompressed one by one to detect the end of the file inside a frame
+    def __init__(self, fpath, zstandard):
+        self.f = open(fpath, 'rb')
+        self.zstandard = zstandard
+        self.decompressor = None
+        self.buffer = b''
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while self.pos == len(self.buffer):
+            data = self.f.read(ZSTD_READ_SIZE)
+            if not data:
+                if self.decompressor and not self.decompressor.eof:
+                    raise EOFError("compressed file ended before the end of zstd frame")
+                return 0
+            self.buffer, self.pos = b'', 0
+            while data:
+                if self.decompressor is None or self.decompressor.eof:
+                    self.decompressor = self.zstandard.ZstdDecompressor().decompressobj()
+                try:
+                    self.buffer += self.decompressor.decompress(data)
+                except self.zstandard.ZstdError as e:
+                    raise OSError(str(e))
+                data = self.decompressor.unused_data if self.decompressor.eof else b''
+        size = min(len(b), len(self.buffer) - self.pos)
+        b[:size] = self.buffer[self.pos:self.pos + size]
+        self.pos += size
+        return size
+
+    def close(self):
+        self.f.close()
+        io.RawIOBase.close(self)
+
+
 def is_empty_file(fpath):
     return not fpath or not exists(fpath) or getsize(fpath) < 10
 
 
 def get_filename(fpath):
-    return splitext(basename(fpath))[0]
+    return splitext(basename(strip_compression_suffix(fpath)))[0]
 
 
 def get_quast_filename(fpath):
@@ -191,10 +448,113 @@ def convert_to_unicode(value):
 
 def find_file_by_pattern(dir, pattern):
     if dir:
-        files = [join(path, file) for (path, dirs, files) in os.walk(dir) for file in files
-                 if file.endswith(pattern)]
-        if files:
-            return files[0]
+        return get_dir_manifest(dir).find(pattern)
+
+
+def find_file_in_dir(dir, fname):
+    # the same as get_input_fpath(join(dir, fname)), but the file is looked up in the manifest of the folder
+    return get_dir_manifest(dir).find_path(fname)
+
+
+DIR_MANIFEST_VERSION = 2  # increase when the format of the manifest changes
+DIR_MANIFEST_FNAME = "input_dir.manifest"
+
+dir_manifests = dict()
+
+
+class DirManifest:
+    # files of the assembler output folder collected in one os.walk pass.
+    # Files are indexed by the last extension (compression suffix is ignored) to look them up by name suffix,
+    # the output folder of AGB is skipped if it is inside the assembler output folder
+    def __init__(self, dirpath, excluded_dirpath=None):
+        self.dirpath = abspath(dirpath)
+        self.excluded_dirpath = abspath(excluded_dirpath) if excluded_dirpath else None
+        self.dirs = []   # (path, mtime) of all folders, a folder mtime changes when files are added or removed
+        self.files = []  # paths in os.walk order
+        for path, dirs, files in os.walk(self.dirpath):
+            self.dirs.append((path, os.stat(path).st_mtime_ns))
+            dirs[:] = [d for d in dirs if join(path, d) != self.excluded_dirpath]
+            for fname in files:
+                self.files.append(join(path, fname))
+        self.build_index()
+
+    def build_index(self):
+        self.files_by_ext = defaultdict(list)
+        for fpath in self.files:
+            fname = strip_compression_suffix(basename(fpath))
+            self.files_by_ext[fname.rsplit('.', 1)[-1]].append((fname, fpath))
+        self.paths = set(self.files)
+        self.found_files = dict()  # results of all lookups, they define which input files were used
+
+    def find(self, pattern):
+        key = ('pattern', pattern)
+        if key not in self.found_files:
+            candidates = self.files_by_ext.get(pattern.rsplit('.', 1)[-1], []) if '.' in pattern else \
+                itertools.chain.from_iterable(self.files_by_ext.values())
+            self.found_files[key] = next((fpath for fname, fpath in candidates if fname.endswith(pattern)), None)
+        return self.found_files[key]
+
+    def find_path(self, fname):
+        key = ('path', fname)
+        if key not in self.found_files:
+            fpath = join(self.dirpath, fname)
+            compressed_fpaths = [fpath + suffix for suffix in COMPRESSION_SUFFIXES if fpath + suffix in self.paths]
+            self.found_files[key] = fpath if fpath in self.paths or not compressed_fpaths else compressed_fpaths[0]
+        return self.found_files[key]
+
+    def lookup(self, key):
+        kind, name = key
+        return self.find(name) if kind == 'pattern' else self.find_path(name)
+
+    def is_actual(self):
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime for path, mtime in self.dirs)
+        except OSError:
+            return False
+
+    def __getstate__(self):
+        return self.dirpath, self.excluded_dirpath, self.dirs, self.files
+
+    def __setstate__(self, state):
+        self.dirpath, self.excluded_dirpath, self.dirs, self.files = state
+        self.build_index()
+
+
+def get_file_stat(fpath):
+    try:
+        stat = os.stat(fpath)
+    except OSError:  # broken symlink or missing file
+        return fpath, None, None
+    return fpath, stat.st_size, stat.st_mtime_ns
+
+
+def get_dir_manifest(dirpath, excluded_dirpath=None):
+    dirpath = abspath(dirpath)
+    if dirpath not in dir_manifests:
+        dir_manifests[dirpath] = DirManifest(dirpath, excluded_dirpath)
+    return dir_manifests[dirpath]
+
+
+def load_dir_manifest(dirpath, output_dirpath, reuse=True):
+    # reuse the manifest saved by the previous run if no files were added or removed since then
+    manifest_fpath = join(output_dirpath, DIR_MANIFEST_FNAME)
+    dirpath = abspath(dirpath)
+    if reuse and not is_empty_file(manifest_fpath):
+        try:
+            with open(manifest_fpath, 'rb') as f:
+                version, manifest = pickle.load(f)
+            if version == DIR_MANIFEST_VERSION and manifest.dirpath == dirpath and \
+                    manifest.excluded_dirpath == abspath(output_dirpath) and manifest.is_actual():
+                dir_manifests[dirpath] = manifest
+                return manifest
+        except Exception:
+            pass
+    manifest = get_dir_manifest(dirpath, output_dirpath)
+    tmp_fpath = manifest_fpath + ".tmp"
+    with open(tmp_fpath, 'wb') as f:
+        pickle.dump((DIR_MANIFEST_VERSION, manifest), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_fpath, manifest_fpath)
+    return manifest
 
 
 def embed_css_and_scripts(html):
@@ -1,17 +1,22 @@
 import json
+import multiprocessing
 import re
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 import networkx as nx
 
 from agb_src.scripts.config import *
 from agb_src.scripts.graph_analysis import process_graph
-from agb_src.scripts.utils import print_dot_header, get_edge_agv_id, calculate_median_cov, is_empty_file, \
+from agb_src.scripts.utils import print_dot_header, get_edge_id, calculate_median_cov, is_empty_file, \
     find_file_by_pattern, get_edge_num, get_canu_id, get_scaffolds_fpath, is_flye, is_canu, is_spades, edge_id_to_name, \
-    get_match_edge_id
+    get_match_edge_id, format_edge_id, get_input_fpath, open_file
 
+mode_jobs = None  # viewer modes and read-only graph data shared with the forked worker processes
 
-def build_jsons(dict_edges, input_dirpath, output_dirpath, mapping_info, chrom_names, edge_by_chrom, contig_edges, assembler):
+
+def build_jsons(dict_edges, input_dirpath, output_dirpath, mapping_info, chrom_names, edge_by_chrom, contig_edges, assembler,
+                threads=1, partitioner=None, layout_cache_dirpath=None):
     edges_by_nodes = defaultdict(list)
     two_way_edges = defaultdict(list)
 
@@ -34,26 +39,60 @@ def build_jsons(dict_edges, input_dirpath, output_dirpath, mapping_info, chrom_n
     undirected_g = g.to_undirected()
     print("Building JSON files...")
     # create JSON files for each mode
-    edges_by_component = process_graph(g, undirected_g, dict_edges, edges_by_nodes, two_way_edges, output_dirpath, 'def', assembler)
-    edges_by_repeat_component = process_graph(repeat_g, undirected_g, dict_edges, edges_by_nodes, two_way_edges,
-                                              output_dirpath, 'repeat', assembler, base_graph=g)
-    edges_by_ref_component = process_graph(g, undirected_g, dict_edges, edges_by_nodes, two_way_edges,
-                                           output_dirpath, 'ref', assembler, chrom_names=chrom_names,
-                                           edge_by_chrom=edge_by_chrom, mapping_info=mapping_info)
-    edges_by_contig_component = process_graph(g, undirected_g, dict_edges, edges_by_nodes, two_way_edges,
-                                              output_dirpath, 'contig', assembler, contig_edges=contig_edges)
+    modes = [('def', g, dict()),
+             ('repeat', repeat_g, {'base_graph': g}),
+             ('ref', g, {'chrom_names': chrom_names, 'edge_by_chrom': edge_by_chrom, 'mapping_info': mapping_info}),
+             ('contig', g, {'contig_edges': contig_edges})]
+    edges_by_component, edges_by_repeat_component, edges_by_ref_component, _ = \
+        build_modes(modes, undirected_g, dict_edges, edges_by_nodes, two_way_edges, output_dirpath, assembler,
+                    threads, partitioner, layout_cache_dirpath)
     create_contig_info(dict_edges, input_dirpath, output_dirpath, contig_edges,
                        edges_by_component, edges_by_repeat_component, edges_by_ref_component, assembler)
     with open(join(output_dirpath, 'title.json'), 'w') as handle:
         handle.write("title='yeast';\n")
 
 
+def build_modes(modes, undirected_g, dict_edges, edges_by_nodes, two_way_edges, output_dirpath, assembler, threads=1,
+                partitioner=None, layout_cache_dirpath=None):
+    '''
+    Runs process_graph for each viewer mode and returns edges_by_component dicts in the order of modes.
+    Modes write separate files and do not change the shared graph data, so they are built concurrently
+    by forked processes, the threads are divided between them.
+    '''
+    workers = min(threads, len(modes))
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return [process_graph(mode_g, undirected_g, dict_edges, edges_by_nodes, two_way_edges, output_dirpath, suffix,
+                              assembler, threads=threads, partitioner=partitioner,
+                              layout_cache_dirpath=layout_cache_dirpath, **options)
+                for suffix, mode_g, options in modes]
+
+    global mode_jobs
+    mode_jobs = (modes, undirected_g, dict_edges, edges_by_nodes, two_way_edges, output_dirpath, assembler,
+                 max(1, threads // workers), partitioner, layout_cache_dirpath)
+    try:
+        # workers of the executor are not daemonic, so each mode can split its components in several processes
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            return list(executor.map(build_mode, range(len(modes))))
+    finally:
+        mode_jobs = None
+
+
+def build_mode(mode_idx):
+    # worker process: build JSON files of one viewer mode using the graph data inherited from the parent process
+    modes, undirected_g, dict_edges, edges_by_nodes, two_way_edges, output_dirpath, assembler, threads, partitioner, \
+        layout_cache_dirpath = mode_jobs
+    suffix, mode_g, options = modes[mode_idx]
+    return process_graph(mode_g, undirected_g, dict_edges, edges_by_nodes, two_way_edges, output_dirpath, suffix,
+                         assembler, threads=threads, partitioner=partitioner, layout_cache_dirpath=layout_cache_dirpath,
+                         **options)
+
+
 def parse_canu_contigs_info(input_dirpath):
     contig_info = dict()
     edges_by_contig = defaultdict(list)
     unitigs_info_fpath = find_file_by_pattern(input_dirpath, "unitigs.bed")
     if input_dirpath and not is_empty_file(unitigs_info_fpath):
-        with open(unitigs_info_fpath) as f:
+        with open_file(unitigs_info_fpath) as f:
             for line in f:
                 fs = line.strip().split()
                 contig, start, end, unitig = fs[:4]
@@ -65,7 +104,7 @@ def parse_canu_contigs_info(input_dirpath):
     if input_dirpath and not is_empty_file(contigs_info_fpath):
         len_col = None
         cov_col = None
-        with open(contigs_info_fpath) as f:
+        with open_file(contigs_info_fpath) as f:
             for i, line in enumerate(f):
                 if i == 0:
                     header = line.strip().split()
@@ -87,8 +126,9 @@ def parse_canu_contigs_info(input_dirpath):
 
 def parse_flye_contigs_info(input_dirpath):
     contig_info = dict()
-    if input_dirpath and not is_empty_file(join(input_dirpath, 'assembly_info.txt')):
-        with open(join(input_dirpath, 'assembly_info.txt')) as f:
+    info_fpath = get_input_fpath(join(input_dirpath, 'assembly_info.txt')) if input_dirpath else None
+    if input_dirpath and not is_empty_file(info_fpath):
+        with open_file(info_fpath) as f:
             for i, line in enumerate(f):
                 if i == 0:
                     header = line.strip().split()
@@ -108,7 +148,7 @@ def parse_spades_contigs_info(input_dirpath, contig_edges):
     node_pattern = '_length_(?P<length>\d+)_cov_(?P<cov>\d+\.?\d*)'
     scaffolds_fpath = get_scaffolds_fpath(SPADES_NAME, input_dirpath)
     if scaffolds_fpath:
-        with open(scaffolds_fpath) as f:
+        with open_file(scaffolds_fpath) as f:
             for line in f:
                 if line.startswith('>'):
                     contig = line.strip()[1:]
@@ -134,7 +174,7 @@ def create_contig_info(dict_edges, input_dirpath, output_dirpath, contig_edges,
     elif is_spades(assembler):
         contig_info = parse_spades_contigs_info(input_dirpath, contig_edges)
     if not contig_info:
-        with open(join(output_dirpath, 'contig_info.json'), 'a') as handle:
+        with open(join(output_dirpath, 'contig_info.json'), 'w') as handle:
             handle.write("contigInfo=" + json.dumps([]) + ";\n")
 
         with open(join(output_dirpath, 'edges_base_info.json'), 'w') as handle:
@@ -149,7 +189,7 @@ def create_contig_info(dict_edges, input_dirpath, output_dirpath, contig_edges,
         ref_subgraph = None
         edges = data['edges']
         for edge_name in set(edges):
-            edge_id = get_edge_agv_id(edge_name)
+            edge_id = get_edge_id(edge_name)
             if edge_id in dict_edges:
                 edge_contigs[edge_id].add(contig)
                 match_edge_id = get_match_edge_id(edge_id)
@@ -165,10 +205,9 @@ def create_contig_info(dict_edges, input_dirpath, output_dirpath, contig_edges,
         data['num_edges'] = str(len(edges))
         contig_info[contig] = data
 
-    for edge_id in edge_contigs:
-        edge_contigs[edge_id] = list(edge_contigs[edge_id])
+    edge_contigs = dict((format_edge_id(edge_id), list(contigs)) for edge_id, contigs in edge_contigs.items())
 
-    with open(join(output_dirpath, 'contig_info.json'), 'a') as handle:
+    with open(join(output_dirpath, 'contig_info.json'), 'w') as handle:
         handle.write("contigInfo=" + json.dumps(contig_info) + ";\n")
 
     with open(join(output_dirpath, 'edges_base_info.json'), 'w') as handle:
@@ -85,7 +85,7 @@ setup(
     # To provide executable scripts, use entry points in preference to the
     # "scripts" keyword. Entry points provide cross-platform support and allow
     # pip to create the appropriate form of executable for the target platform.
-    scripts=['agb.py'],
+    scripts=['agb.py', 'agb_export.py'],
     classifiers=[
         'Environment :: Console',
         'Environment :: Web Environment',
@@ -0,0 +1,37 @@
+import io
+
+import pytest
+
+from agb_src.scripts import gfa_reader
+from agb_src.scripts.gfa_reader import EdgeSeqWriter, iter_gfa_records
+
+CRLF_GFA = (b"H\tVN:Z:1.0\r\n"
+            b"S\t1\tACGTACGTAC\tdp:f:2.5\r\n"
+            b"S\t2\tACGTACGTACGTACG\r\n"
+            b"S\t3\t*\tLN:i:42\r\n"
+            b"L\t1\t+\t2\t-\t0M\r\n")
+NO_FINAL_BREAK_GFA = (b"S\t1\tACGTACGTAC\n"
+                      b"S\t2\t*")
+
+
+def read_segments(data):
+    out_f = io.BytesIO()
+    seq_writer = EdgeSeqWriter(out_f, 0, lambda name: name)
+    segments = [fs for record_type, fs in iter_gfa_records(io.BytesIO(data), seq_writer) if record_type == 'S']
+    return segments, out_f.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", range(3, len(CRLF_GFA) + 2))
+def test_crlf_split_by_chunk_border(monkeypatch, chunk_size):
+    monkeypatch.setattr(gfa_reader, "CHUNK_SIZE", chunk_size)
+    segments, seqs = read_segments(CRLF_GFA)
+    assert segments == [('1', 10, {'dp': '2.5'}), ('2', 15, {}), ('3', None, {'ln': '42'})]
+    assert seqs == b">1\nACGTACGTAC\n>2\nACGTACGTACGTACG\n"
+
+
+@pytest.mark.parametrize("chunk_size", range(3, len(NO_FINAL_BREAK_GFA) + 2))
+def test_empty_sequence_on_last_line(monkeypatch, chunk_size):
+    monkeypatch.setattr(gfa_reader, "CHUNK_SIZE", chunk_size)
+    segments, seqs = read_segments(NO_FINAL_BREAK_GFA)
+    assert segments == [('1', 10, {}), ('2', None, {})]
+    assert seqs == b">1\nACGTACGTAC\n"